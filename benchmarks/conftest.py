@@ -0,0 +1,147 @@
+"""Микробенчмарки: `python -m pytest benchmarks`.
+
+Время каждого бенчмарка сравнивается с benchmarks/baselines.json.
+Базовые значения масштабируются по калибровочному циклу, чтобы их
+можно было сравнивать на машинах разной скорости. Обновить базу:
+`python -m pytest benchmarks --update-baselines`.
+"""
+import json
+import timeit
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from benchmarks.sizes import COMMENT_COUNTS, DATASET_SIZES
+from blog.models import Category, Comment, Location, Post
+
+BASELINES = Path(__file__).parent / 'baselines.json'
+
+DEFAULT_THRESHOLD = 0.5
+
+ROUNDS = 5
+
+_results = {}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--update-baselines', action='store_true',
+        help='Записать измерения в benchmarks/baselines.json.',
+    )
+    parser.addoption(
+        '--benchmark-threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Допустимое замедление относительно базы, доля.',
+    )
+
+
+def calibrate():
+    """Время чистого Python-цикла: мера скорости текущей машины."""
+    return min(timeit.repeat(
+        'sum(i * i for i in range(100000))', number=1, repeat=ROUNDS
+    ))
+
+
+def load_baselines():
+    if not BASELINES.exists():
+        return {'calibration': None, 'benchmarks': {}}
+    return json.loads(BASELINES.read_text(encoding='utf-8'))
+
+
+@pytest.fixture(scope='session')
+def baselines():
+    return load_baselines()
+
+
+@pytest.fixture(scope='session')
+def machine_scale(baselines):
+    if not baselines['calibration']:
+        return 1.0
+    return calibrate() / baselines['calibration']
+
+
+@pytest.fixture
+def benchmark(request, baselines, machine_scale):
+    """Измеряет func и сравнивает лучшее время вызова с базой."""
+    def run(name, func):
+        timer = timeit.Timer(func)
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=ROUNDS, number=number)) / number
+        _results[name] = best
+        baseline = baselines['benchmarks'].get(name)
+        if request.config.getoption('--update-baselines') or not baseline:
+            return best
+        threshold = request.config.getoption('--benchmark-threshold')
+        limit = baseline * machine_scale * (1 + threshold)
+        assert best <= limit, (
+            f'Бенчмарк {name} замедлился: {best * 1000:.3f} мс на вызов '
+            f'при базе {baseline * machine_scale * 1000:.3f} мс '
+            f'(порог +{threshold:.0%}).'
+        )
+        return best
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not session.config.getoption('--update-baselines') or not _results:
+        return
+    data = load_baselines()
+    data['calibration'] = calibrate()
+    data['benchmarks'].update(_results)
+    data['benchmarks'] = dict(sorted(data['benchmarks'].items()))
+    BASELINES.write_text(
+        json.dumps(data, indent=2, ensure_ascii=False) + '\n',
+        encoding='utf-8',
+    )
+
+
+def _create_dataset(author, location, size):
+    category = Category.objects.create(
+        title=f'Категория {size}', description='Описание',
+        slug=f'size-{size}',
+    )
+    now = timezone.now()
+    Post.objects.bulk_create(
+        Post(
+            title=f'Пост {number}', text='Текст публикации. ' * 20,
+            pub_date=now - timedelta(hours=number), author=author,
+            category=category, location=location,
+        )
+        for number in range(size)
+    )
+    return category
+
+
+def _create_commented_post(author, category, count):
+    post = Post.objects.create(
+        title=f'Пост с {count} комментариями', text='Текст',
+        pub_date=timezone.now() - timedelta(days=1), author=author,
+        category=category,
+    )
+    Comment.objects.bulk_create(
+        Comment(post=post, author=author, text=f'Комментарий {number}')
+        for number in range(count)
+    )
+    return post
+
+
+@pytest.fixture(scope='session')
+def dataset(django_db_setup, django_db_blocker):
+    """Категории с разным числом постов и посты с разным числом комментариев.
+
+    Данные создаются один раз на сессию и не откатываются между тестами.
+    """
+    with django_db_blocker.unblock():
+        author = get_user_model().objects.create(username='bench')
+        location = Location.objects.create(name='Москва')
+        categories = {
+            size: _create_dataset(author, location, size)
+            for size in DATASET_SIZES
+        }
+        commented = {
+            count: _create_commented_post(author, categories[100], count)
+            for count in COMMENT_COUNTS
+        }
+    return {'categories': categories, 'commented': commented}
@@ -0,0 +1,4 @@
+"""Размеры наборов данных, общие для бенчмарков и их фикстур."""
+DATASET_SIZES = (100, 1000, 10000)
+
+COMMENT_COUNTS = (10, 100, 1000)
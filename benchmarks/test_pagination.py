@@ -0,0 +1,24 @@
+import pytest
+from django.test import RequestFactory
+
+from benchmarks.sizes import DATASET_SIZES
+from blog.models import Post
+from blog.utils.pagination import get_paginated_page
+
+pytestmark = [pytest.mark.django_db]
+
+SIZE = max(DATASET_SIZES)
+
+
+@pytest.mark.parametrize('depth', ['first', 'middle', 'last'])
+def test_pagination(benchmark, dataset, depth):
+    category = dataset['categories'][SIZE]
+    page = {'first': 1, 'middle': SIZE // 20, 'last': SIZE // 10}[depth]
+    request = RequestFactory().get('/', {'page': page})
+    queryset = Post.objects.published().with_related().with_comment_count(
+    ).filter(category=category).order_by('-pub_date')
+
+    def paginate():
+        return list(get_paginated_page(queryset, request))
+
+    benchmark(f'pagination.{depth}', paginate)
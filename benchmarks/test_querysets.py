@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.sizes import DATASET_SIZES
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize('size', DATASET_SIZES)
+def test_feed_queryset(benchmark, dataset, size):
+    category = dataset['categories'][size]
+
+    def feed():
+        queryset = Post.objects.published().with_related(
+        ).with_comment_count().filter(category=category).order_by('-pub_date')
+        return queryset.count(), list(queryset[:10])
+
+    benchmark(f'queryset.feed[{size}]', feed)
@@ -0,0 +1,55 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from benchmarks.sizes import COMMENT_COUNTS
+from blog.forms import CommentForm
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def request_factory_request():
+    request = RequestFactory().get('/')
+    request.user = AnonymousUser()
+    return request
+
+
+def feed_page(category):
+    return Paginator(
+        Post.objects.published().with_related().with_comment_count(
+        ).filter(category=category).order_by('-pub_date'), 10
+    ).get_page(1)
+
+
+def test_render_index(benchmark, dataset, request_factory_request):
+    page_obj = feed_page(dataset['categories'][100])
+    list(page_obj)
+    benchmark('template.index', lambda: render_to_string(
+        'blog/index.html', {'page_obj': page_obj},
+        request=request_factory_request,
+    ))
+
+
+@pytest.mark.parametrize('count', COMMENT_COUNTS)
+def test_render_detail(benchmark, dataset, request_factory_request, count):
+    post = Post.objects.with_related().get(pk=dataset['commented'][count].pk)
+    comments = list(
+        post.comments.select_related('author').order_by('created_at')
+    )
+    benchmark(f'template.detail[{count}]', lambda: render_to_string(
+        'blog/detail.html',
+        {'post': post, 'comments': comments, 'form': CommentForm()},
+        request=request_factory_request,
+    ))
+
+
+def test_render_post_card(benchmark, dataset, request_factory_request):
+    post = feed_page(dataset['categories'][100])[0]
+    benchmark('template.post_card', lambda: render_to_string(
+        'includes/post_card.html', {'post': post},
+        request=request_factory_request,
+    ))
@@ -0,0 +1,99 @@
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+from core.generations import bump_generations, versioned_key
+
+# Категории, местоположения и имена авторов видны на всех страницах,
+# но меняются редко, поэтому у них одно общее поколение.
+LOOKUPS = 'lookups'
+FEED = 'feed'
+
+# Посты, которые сейчас удаляются: их комментарии удаляются каскадом,
+# и отдельная инвалидация для каждого из них не нужна.
+_deleting_posts = threading.local()
+
+
+def category_namespace(slug):
+    return f'category:{slug}'
+
+
+def author_namespace(author_id):
+    return f'author:{author_id}'
+
+
+def author_id(username):
+    """Id пользователя по имени; 0, если такого нет.
+
+    Имя меняется только вместе с поколением справочников, поэтому
+    соответствие хранится в кеше под ключом с этим поколением.
+    """
+    cache = caches[settings.GENERATION_CACHE]
+    key = versioned_key('author_id', [LOOKUPS], username)
+    found = cache.get(key)
+    if found is None:
+        found = get_user_model().objects.filter(
+            username=username
+        ).values_list('id', flat=True).first() or 0
+        cache.set(key, found)
+    return found
+
+
+def post_namespace(post_id):
+    return f'post:{post_id}'
+
+
+def index_dependencies(request):
+    return [FEED, LOOKUPS]
+
+
+def category_dependencies(request, category_slug):
+    return [category_namespace(category_slug), LOOKUPS]
+
+
+def profile_dependencies(request, username):
+    return [author_namespace(author_id(username)), LOOKUPS]
+
+
+def post_dependencies(request, post_id):
+    return [post_namespace(post_id), LOOKUPS]
+
+
+def bump_post(post_id, category_slugs=(), author_ids=()):
+    bump_generations([
+        FEED,
+        post_namespace(post_id),
+        *(category_namespace(slug) for slug in category_slugs if slug),
+        *(author_namespace(pk) for pk in author_ids if pk),
+    ])
+
+
+@contextmanager
+def deleting_post(post_id):
+    """Отмечает пост, комментарии которого удаляются каскадом."""
+    ids = _deleting_posts.__dict__.setdefault('ids', set())
+    ids.add(post_id)
+    try:
+        yield
+    finally:
+        ids.discard(post_id)
+
+
+def is_being_deleted(post_id):
+    return post_id in getattr(_deleting_posts, 'ids', ())
+
+
+def bump_lookups():
+    bump_generations([LOOKUPS])
+
+
+def bump_bulk_load(category_slugs=()):
+    """Сбрасывает ленты после загрузки данных в обход сигналов моделей."""
+    bump_generations([
+        FEED,
+        LOOKUPS,
+        *(category_namespace(slug) for slug in category_slugs),
+    ])
@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Max
+from django.http import Http404
+
+from core.bloom import BloomFilter, IdBitmap
+from core.generations import bump_generations, get_generations
+from .models import Post
+
+EXISTENCE = 'existence'
+RECENT_USERNAME_PREFIX = 'exists:user'
+RECENT_POST_PREFIX = 'exists:post'
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class ExistenceIndex:
+    """Отсекает запросы к заведомо несуществующим постам и профилям.
+
+    Id постов хранятся точной битовой картой, имена пользователей —
+    фильтром Блума. Посты и пользователи, созданные после сборки,
+    попадают в индекс сразу и на время до следующей сборки отмечаются
+    в общем кеше, откуда их узнают другие процессы. Поэтому для id
+    больше максимального на момент сборки проверяется только кеш.
+    Если после сборки данные грузились в обход сигналов (поколение
+    `existence`), запросы до пересборки идут в базу как обычно.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._rebuilding = False
+        self.post_ids = None
+        self.usernames = None
+        self.max_post_id = 0
+        self.built_max_post_id = 0
+        self.generation = None
+        self.built_at = 0
+        self.checked_at = 0
+
+    def rebuild(self):
+        generation = get_generations([EXISTENCE])[EXISTENCE]
+        max_post_id = Post.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        post_ids = IdBitmap(max_post_id)
+        for post_id in Post.objects.values_list('id', flat=True).iterator(
+            chunk_size=10000
+        ):
+            post_ids.add(post_id)
+        user_count = User.objects.count()
+        usernames = BloomFilter(
+            # Запас под пользователей, которые появятся до пересборки.
+            int(user_count * 1.25) + 1000,
+            settings.EXISTENCE_INDEX_ERROR_RATE,
+        )
+        for username in User.objects.values_list(
+            'username', flat=True
+        ).iterator(chunk_size=10000):
+            usernames.add(username)
+        with self._lock:
+            self.post_ids = post_ids
+            self.usernames = usernames
+            self.max_post_id = self.built_max_post_id = max_post_id
+            self.generation = generation
+            self.built_at = self.checked_at = time.monotonic()
+        logger.info('Индекс существования пересобран: %s', self.stats())
+
+    def _ready(self):
+        """Можно ли доверять отрицательным ответам индекса."""
+        if self.post_ids is None:
+            with self._build_lock:
+                if self.post_ids is None:
+                    self.rebuild()
+        now = time.monotonic()
+        # Поколение сверяется не чаще раза в интервал, чтобы ответ
+        # на случайный id не обращался даже к кешу.
+        if now - self.checked_at >= settings.EXISTENCE_INDEX_CHECK_INTERVAL:
+            if get_generations([EXISTENCE])[EXISTENCE] != self.generation:
+                self._rebuild_in_background()
+                return False
+            self.checked_at = now
+        if now - self.built_at > settings.EXISTENCE_INDEX_REBUILD_INTERVAL:
+            self._rebuild_in_background()
+        return True
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception('Не удалось пересобрать индекс существования')
+            finally:
+                close_old_connections()
+                self._rebuilding = False
+
+        threading.Thread(
+            target=run, name='existence-index', daemon=True
+        ).start()
+
+    def post_may_exist(self, post_id):
+        if not settings.EXISTENCE_INDEX_ENABLED or not self._ready():
+            return True
+        if post_id in self.post_ids:
+            return True
+        if post_id <= self.built_max_post_id:
+            return False
+        # Пост новее сборки мог появиться в другом процессе.
+        if cache.get(f'{RECENT_POST_PREFIX}:{post_id}') is None:
+            return False
+        self._remember_post(post_id)
+        return True
+
+    def user_may_exist(self, username):
+        if not settings.EXISTENCE_INDEX_ENABLED or not self._ready():
+            return True
+        return username in self.usernames or cache.get(
+            f'{RECENT_USERNAME_PREFIX}:{username}'
+        ) is not None
+
+    def _remember_post(self, post_id):
+        if self.post_ids is not None:
+            self.post_ids.add(post_id)
+        self.max_post_id = max(self.max_post_id, post_id)
+
+    def add_post(self, post_id):
+        self._remember_post(post_id)
+        cache.set(
+            f'{RECENT_POST_PREFIX}:{post_id}', 1,
+            settings.EXISTENCE_INDEX_REBUILD_INTERVAL * 2,
+        )
+
+    def add_username(self, username):
+        if self.usernames is not None:
+            self.usernames.add(username)
+        # Другие процессы узнают о новом имени до своей пересборки.
+        cache.set(
+            f'{RECENT_USERNAME_PREFIX}:{username}', 1,
+            settings.EXISTENCE_INDEX_REBUILD_INTERVAL * 2,
+        )
+
+    def stats(self):
+        if self.post_ids is None:
+            return {}
+        return {
+            'post_ids': self.post_ids.count,
+            'post_ids_bytes': self.post_ids.memory,
+            'max_post_id': self.max_post_id,
+            'usernames': self.usernames.count,
+            'usernames_bytes': self.usernames.memory,
+            'usernames_hash_count': self.usernames.hash_count,
+            'usernames_false_positive_rate': round(
+                self.usernames.false_positive_rate, 6
+            ),
+        }
+
+
+existence = ExistenceIndex()
+
+
+def invalidate_existence():
+    """Вызывается после загрузки данных в обход сигналов моделей."""
+    bump_generations([EXISTENCE])
+    existence.checked_at = 0
+
+
+def unless_missing(may_exist, message):
+    """Отвечает 404 до кеша страниц, если объекта заведомо нет.
+
+    may_exist получает аргументы представления из URL. Декоратор
+    ставится снаружи cache_page_with_holes: иначе запрос со случайным
+    значением успевает прочитать поколения, кеш страниц и взять
+    блокировку построения страницы.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not may_exist(*args, **kwargs):
+                raise Http404(message)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import PasswordChangeForm
+from .lookups import CategoryChoiceField, LocationChoiceField
 from .models import Post, Comment
 
 
@@ -27,6 +28,10 @@ class PostForm(forms.ModelForm):
         help_texts = {
             'pub_date': 'Для отложенных публикаций установите будущую дату',
         }
+        field_classes = {
+            'category': CategoryChoiceField,
+            'location': LocationChoiceField,
+        }
 
 
 class ProfileEditForm(forms.ModelForm):
@@ -0,0 +1,7 @@
+from core.holes import register_hole
+from .forms import CommentForm
+
+
+@register_hole('includes/comment_form.html')
+def comment_form(request, post_id):
+    return {'form': CommentForm()}
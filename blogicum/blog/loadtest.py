@@ -0,0 +1,111 @@
+"""Сценарии нагрузочного теста блога (см. core/loadtest.py)."""
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+
+from core import loadtest
+
+from .models import Category, Post
+
+User = get_user_model()
+
+POOL_SIZE = 1000
+MAX_PAGE = 20
+
+
+@loadtest.setup
+def blog_data():
+    categories = list(
+        Category.objects.filter(is_published=True).values_list('id', 'slug')
+    )
+    return {
+        'post_ids': list(
+            Post.objects.published().order_by('-pub_date').values_list(
+                'id', flat=True
+            )[:POOL_SIZE]
+        ),
+        'category_ids': [category_id for category_id, _ in categories],
+        'category_slugs': [slug for _, slug in categories],
+        'usernames': list(
+            User.objects.filter(posts__isnull=False).distinct().values_list(
+                'username', flat=True
+            )[:POOL_SIZE]
+        ),
+        'users': list(User.objects.filter(is_active=True)[:50]),
+    }
+
+
+def _image():
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), (135, 206, 250)).save(buffer, 'PNG')
+    return SimpleUploadedFile('load.png', buffer.getvalue(), 'image/png')
+
+
+@loadtest.scenario(weight=40)
+def anonymous_feed(session):
+    session.get('blog:index')
+    if session.data['category_slugs']:
+        session.get(
+            'blog:category_posts',
+            session.random.choice(session.data['category_slugs']),
+        )
+    if session.data['usernames']:
+        session.get(
+            'blog:profile', session.random.choice(session.data['usernames'])
+        )
+
+
+@loadtest.scenario(weight=10)
+def pagination_depth(session):
+    depth = session.random.randint(1, MAX_PAGE)
+    for page in range(1, depth + 1):
+        session.get('blog:index', data={'page': page})
+
+
+@loadtest.scenario(weight=30)
+def post_detail(session):
+    if session.data['post_ids']:
+        session.get(
+            'blog:post_detail', session.random.choice(session.data['post_ids'])
+        )
+
+
+@loadtest.scenario(weight=5)
+def static_pages(session):
+    session.get('pages:about')
+    session.get('pages:rules')
+
+
+@loadtest.scenario(weight=10)
+def logged_in_commenting(session):
+    if not session.data['post_ids'] or not session.data['users']:
+        return
+    user = session.random.choice(session.data['users'])
+    post_id = session.random.choice(session.data['post_ids'])
+    session.get('blog:post_detail', post_id, user=user)
+    session.post(
+        'blog:add_comment', post_id,
+        data={'text': 'Комментарий нагрузочного теста'}, user=user,
+    )
+
+
+@loadtest.scenario(weight=5)
+def post_creation(session):
+    if not session.data['users']:
+        return
+    user = session.random.choice(session.data['users'])
+    session.get('blog:create_post', user=user)
+    category_ids = session.data['category_ids']
+    session.post('blog:create_post', user=user, data={
+        'title': 'Пост нагрузочного теста',
+        'text': 'Текст нагрузочного теста',
+        'pub_date': timezone.now().strftime('%Y-%m-%dT%H:%M'),
+        'category': (
+            session.random.choice(category_ids) if category_ids else ''
+        ),
+        'is_published': True,
+        'image': _image(),
+    })
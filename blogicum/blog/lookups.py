@@ -0,0 +1,176 @@
+import threading
+from collections import namedtuple
+
+from django import forms
+from django.core.exceptions import ValidationError
+
+from core.generations import get_generations
+from .caching import LOOKUPS
+from .models import Category, Location
+
+Tables = namedtuple('Tables', [
+    'categories', 'categories_by_id', 'categories_by_slug',
+    'locations', 'locations_by_id',
+])
+
+
+class LookupTables:
+    """Категории и местоположения процесса в памяти.
+
+    Таблицы маленькие и меняются редко: снимок перечитывается, только
+    когда сигнал сбросил его в этом процессе или другой процесс увеличил
+    поколение `lookups`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def _tables(self):
+        generation = get_generations([LOOKUPS])[LOOKUPS]
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == generation:
+            return snapshot[1]
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot[0] == generation:
+                return snapshot[1]
+            categories = list(Category.objects.all())
+            locations = list(Location.objects.all())
+            tables = Tables(
+                categories=categories,
+                categories_by_id={item.pk: item for item in categories},
+                categories_by_slug={item.slug: item for item in categories},
+                locations=locations,
+                locations_by_id={item.pk: item for item in locations},
+            )
+            self._snapshot = (generation, tables)
+            return tables
+
+    def categories(self):
+        return self._tables().categories
+
+    def locations(self):
+        return self._tables().locations
+
+    def category(self, pk):
+        return self._tables().categories_by_id.get(pk)
+
+    def location(self, pk):
+        return self._tables().locations_by_id.get(pk)
+
+    def published_category(self, slug):
+        category = self._tables().categories_by_slug.get(slug)
+        if category is None or not category.is_published:
+            return None
+        return category
+
+
+lookups = LookupTables()
+
+
+def attach_lookups(post):
+    """Проставляет посту категорию и местоположение из LookupTables."""
+    for name, get in (
+        ('category', lookups.category), ('location', lookups.location),
+    ):
+        field = post._meta.get_field(name)
+        pk = getattr(post, field.attname)
+        if pk is None or field.is_cached(post):
+            continue
+        obj = get(pk)
+        if obj is not None:
+            field.set_cached_value(post, obj)
+
+
+class LookupChoiceIterator(forms.models.ModelChoiceIterator):
+    """Варианты из LookupTables, пока queryset поля не подменён."""
+
+    def __iter__(self):
+        if not self.field.uses_lookups:
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for obj in self.field.get_objects():
+            yield self.choice(obj)
+
+    def __len__(self):
+        if not self.field.uses_lookups:
+            return super().__len__()
+        return len(self.field.get_objects()) + (
+            1 if self.field.empty_label is not None else 0
+        )
+
+    def __bool__(self):
+        if not self.field.uses_lookups:
+            return super().__bool__()
+        return (
+            self.field.empty_label is not None
+            or bool(self.field.get_objects())
+        )
+
+
+class LookupChoiceField(forms.ModelChoiceField):
+    """ModelChoiceField, который берёт варианты из LookupTables.
+
+    Если форма заменила queryset (например, на `.none()` в purge_css),
+    поле работает как обычный ModelChoiceField с этим queryset.
+    """
+
+    iterator = LookupChoiceIterator
+    objects_getter = None
+    object_getter = None
+    uses_lookups = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.uses_lookups = not self.queryset.query.has_filters()
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.uses_lookups = self.uses_lookups
+        return result
+
+    def _set_queryset(self, queryset):
+        super()._set_queryset(queryset)
+        self.uses_lookups = False
+
+    queryset = property(
+        forms.ModelChoiceField._get_queryset, _set_queryset
+    )
+
+    def get_objects(self):
+        return getattr(lookups, self.objects_getter)()
+
+    def to_python(self, value):
+        if not self.uses_lookups:
+            return super().to_python(value)
+        if value in self.empty_values:
+            return None
+        if isinstance(value, self.queryset.model):
+            value = value.pk
+        try:
+            obj = getattr(lookups, self.object_getter)(int(value))
+        except (TypeError, ValueError):
+            obj = None
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
+
+
+class CategoryChoiceField(LookupChoiceField):
+    objects_getter = 'categories'
+    object_getter = 'category'
+
+
+class LocationChoiceField(LookupChoiceField):
+    objects_getter = 'locations'
+    object_getter = 'location'
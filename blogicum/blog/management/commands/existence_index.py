@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.existence import existence, invalidate_existence
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает индекс существующих постов и пользователей и '
+        'выводит его размер и долю ложных срабатываний.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--invalidate', action='store_true',
+            help='Сообщить всем процессам, что их индексы устарели.',
+        )
+
+    def handle(self, *args, **options):
+        if options['invalidate']:
+            invalidate_existence()
+        existence.rebuild()
+        for name, value in existence.stats().items():
+            self.stdout.write(f'{name}: {value}')
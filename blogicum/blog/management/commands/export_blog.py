@@ -0,0 +1,61 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import (
+    CHUNK_SIZE, EXPORTS, FORMATS, export_stream, parse_since,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты и комментарии в NDJSON или CSV, '
+        'не загружая таблицы в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', choices=[*EXPORTS, 'all'], default='all',
+        )
+        parser.add_argument('--format', choices=FORMATS, default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument(
+            '--since-id', type=int,
+            help='Только объекты с id больше указанного.',
+        )
+        parser.add_argument(
+            '--since',
+            help='Только объекты с датой публикации (для комментариев — '
+                 'создания) не раньше указанной, ISO 8601.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--output', '-o', help='Файл выгрузки; по умолчанию stdout.',
+        )
+
+    def handle(self, *args, **options):
+        kinds = list(EXPORTS) if options['kind'] == 'all' else [
+            options['kind']
+        ]
+        try:
+            since = options['since'] and parse_since(options['since'])
+            stream = export_stream(
+                kinds, options['format'], options['gzip'],
+                since_id=options['since_id'], since=since or None,
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        output = (
+            open(options['output'], 'wb') if options['output']
+            else sys.stdout.buffer
+        )
+        written = 0
+        try:
+            for chunk in stream:
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if options['output']:
+                output.close()
+        self.stderr.write(f'Записано байт: {written}')
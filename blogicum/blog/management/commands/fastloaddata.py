@@ -0,0 +1,77 @@
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from blog.signals import invalidate_after_load
+from core.fixtures import FixtureLoader
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстрая замена loaddata для JSON-дампов: потоковое чтение, '
+        'bulk_create пачками в порядке внешних ключей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            '--signals', action='store_true',
+            help='Отправлять pre_save/post_save для каждого объекта, '
+                 'как loaddata.',
+        )
+        parser.add_argument(
+            '--benchmark', action='store_true',
+            help='Сравнить с loaddata; изменения обеих загрузок '
+                 'откатываются.',
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark']:
+            self.benchmark(options)
+            return
+        loader = self.make_loader(options)
+        with open(options['fixture'], encoding='utf-8') as fp:
+            elapsed = loader.load(fp)
+        self.invalidate()
+        for model, count in loader.counts.items():
+            self.stdout.write(f'{model._meta.label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {sum(loader.counts.values())} '
+            f'за {elapsed:.2f} с'
+        ))
+
+    def make_loader(self, options):
+        return FixtureLoader(
+            using=options['database'],
+            batch_size=options['batch_size'],
+            send_signals=options['signals'],
+        )
+
+    def invalidate(self):
+        invalidate_after_load()
+
+    def benchmark(self, options):
+        using = options['database']
+        timings = {}
+        with transaction.atomic(using=using):
+            started = time.perf_counter()
+            call_command(
+                'loaddata', options['fixture'], database=using,
+                stdout=StringIO(),
+            )
+            timings['loaddata'] = time.perf_counter() - started
+            transaction.set_rollback(True, using=using)
+        with transaction.atomic(using=using):
+            with open(options['fixture'], encoding='utf-8') as fp:
+                timings['fastloaddata'] = self.make_loader(options).load(fp)
+            transaction.set_rollback(True, using=using)
+        for name, seconds in timings.items():
+            self.stdout.write(f'{name}: {seconds:.2f} с')
+        self.stdout.write(
+            f'Ускорение: {timings["loaddata"] / timings["fastloaddata"]:.1f}x'
+        )
@@ -0,0 +1,17 @@
+from django.core.management.commands import loaddata
+
+from blog.signals import invalidate_after_load
+
+
+class Command(loaddata.Command):
+    """loaddata, после которого кеши блога сбрасываются один раз.
+
+    Сигналы моделей при загрузке фикстур (raw=True) ничего не
+    инвалидируют: объекты в фикстуре могут ссылаться на ещё не
+    загруженных авторов и категории.
+    """
+
+    def handle(self, *fixture_labels, **options):
+        super().handle(*fixture_labels, **options)
+        if self.loaded_object_count:
+            invalidate_after_load()
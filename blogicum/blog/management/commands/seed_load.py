@@ -0,0 +1,200 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from blog.models import Category, Comment, Location, Post
+from blog.signals import invalidate_after_load
+from core.bulk import batched, next_id, reset_sequences
+
+User = get_user_model()
+
+# Faker медленный, поэтому тексты генерируются заранее
+# и выбираются из пула случайно.
+TEXT_POOL_SIZE = 500
+
+SEED_PASSWORD = 'seed-password'
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'местоположениями, постами и комментариями для нагрузочных проверок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument(
+            '--years', type=float, default=3,
+            help='За сколько лет распределены даты публикаций.',
+        )
+        parser.add_argument('--future-share', type=float, default=0.03)
+        parser.add_argument('--unpublished-share', type=float, default=0.05)
+        parser.add_argument(
+            '--comment-skew', type=float, default=3.0,
+            help='Чем больше, тем сильнее комментарии сосредоточены '
+                 'на немногих постах.',
+        )
+
+    def handle(self, *args, **options):
+        if (options['posts'] or options['comments']) and not options['users']:
+            raise CommandError(
+                'Посты и комментарии пишут новые пользователи: '
+                'укажите --users больше нуля.'
+            )
+        if options['comments'] and not options['posts']:
+            raise CommandError('Для комментариев нужны новые посты.')
+        self.options = options
+        self.setup_generators(options['seed'])
+        started = time.perf_counter()
+        users = self.load(User, options['users'], self.make_users)
+        categories = self.load(
+            Category, options['categories'], self.make_categories
+        )
+        locations = self.load(
+            Location, options['locations'], self.make_locations
+        )
+        posts = self.load(
+            Post, options['posts'],
+            lambda first, count: self.make_posts(
+                first, count, users, categories, locations
+            ),
+        )
+        self.load(
+            Comment, options['comments'],
+            lambda first, count: self.make_comments(
+                first, count, posts, users
+            ),
+        )
+        reset_sequences([User, Category, Location, Post, Comment])
+        # bulk_create не отправляет сигналы моделей.
+        invalidate_after_load()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def setup_generators(self, seed):
+        self.random = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        if seed is not None:
+            self.faker.seed_instance(seed)
+        self.now = timezone.now()
+        self.words = [self.faker.word() for _ in range(TEXT_POOL_SIZE)]
+        self.sentences = [
+            self.faker.sentence() for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.paragraphs = [
+            self.faker.paragraph(nb_sentences=6)
+            for _ in range(TEXT_POOL_SIZE)
+        ]
+
+    def load(self, model, count, make):
+        """Вставляет объекты пачками и возвращает диапазон их id."""
+        first = next_id(model)
+        done = 0
+        started = time.perf_counter()
+        for batch in batched(make(first, count), self.options['batch_size']):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            done += len(batch)
+            rate = done / max(time.perf_counter() - started, 1e-6)
+            self.stdout.write(
+                f'{model._meta.verbose_name_plural}: {done}/{count} '
+                f'({rate:.0f} в секунду)'
+            )
+        return range(first, first + count)
+
+    def skewed(self, ids, skew):
+        """Случайный id, в котором первые элементы выпадают гораздо чаще."""
+        return ids[int(len(ids) * self.random.random() ** skew)]
+
+    def is_published(self):
+        return self.random.random() >= self.options['unpublished_share']
+
+    def past_date(self):
+        # Чем ближе к сегодняшнему дню, тем больше публикаций.
+        age = 1 - self.random.random() ** 0.5
+        return self.now - timedelta(days=self.options['years'] * 365 * age)
+
+    def pub_date(self):
+        if self.random.random() < self.options['future_share']:
+            return self.now + timedelta(
+                seconds=self.random.uniform(60 * 60, 60 * 60 * 24 * 30)
+            )
+        return self.past_date()
+
+    def make_users(self, first, count):
+        password = make_password(SEED_PASSWORD)
+        names = [self.faker.user_name() for _ in range(TEXT_POOL_SIZE)]
+        first_names = [
+            self.faker.first_name() for _ in range(TEXT_POOL_SIZE)
+        ]
+        last_names = [self.faker.last_name() for _ in range(TEXT_POOL_SIZE)]
+        for user_id in range(first, first + count):
+            yield User(
+                id=user_id,
+                username=f'{self.random.choice(names)}{user_id}',
+                first_name=self.random.choice(first_names),
+                last_name=self.random.choice(last_names),
+                email=f'user{user_id}@example.com',
+                password=password,
+                date_joined=self.past_date(),
+            )
+
+    def make_categories(self, first, count):
+        for category_id in range(first, first + count):
+            yield Category(
+                id=category_id,
+                title=self.random.choice(self.words).capitalize(),
+                description=self.random.choice(self.sentences),
+                slug=f'category-{category_id}',
+                is_published=self.is_published(),
+            )
+
+    def make_locations(self, first, count):
+        for location_id in range(first, first + count):
+            yield Location(
+                id=location_id,
+                name=self.faker.city(),
+                is_published=self.is_published(),
+            )
+
+    def make_posts(self, first, count, users, categories, locations):
+        for post_id in range(first, first + count):
+            yield Post(
+                id=post_id,
+                author_id=self.skewed(users, 2),
+                category_id=(
+                    self.random.choice(categories) if categories else None
+                ),
+                location_id=(
+                    self.random.choice(locations)
+                    if locations and self.random.random() < 0.7 else None
+                ),
+                title=self.random.choice(self.sentences)[:256],
+                text=self.random.choice(self.paragraphs),
+                pub_date=self.pub_date(),
+                is_published=self.is_published(),
+            )
+
+    def make_comments(self, first, count, posts, users):
+        skew = self.options['comment_skew']
+        for comment_id in range(first, first + count):
+            yield Comment(
+                id=comment_id,
+                post_id=self.skewed(posts, skew),
+                author_id=self.random.choice(users),
+                text=self.random.choice(self.sentences),
+            )
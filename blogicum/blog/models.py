@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from .caching import deleting_post
 from .querysets import PostQuerySet
 
 TITLE_MAX_LENGTH = 256
@@ -92,10 +93,25 @@ class Post(BaseBlog):
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        # Ленты: общая, категории и автора — по убыванию даты публикации.
+        indexes = [
+            models.Index(fields=['pub_date'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['category', 'pub_date'], name='post_category_date_idx'
+            ),
+            models.Index(
+                fields=['author', 'pub_date'], name='post_author_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def delete(self, using=None, keep_parents=False):
+        # Комментарии удаляются каскадом и сбрасываются вместе с постом.
+        with deleting_post(self.pk):
+            return super().delete(using, keep_parents)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -114,6 +130,11 @@ class Comment(models.Model):
         ordering = ['created_at']
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'], name='comment_post_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return f'Комментарий {self.author.username} к посту {self.post.id}'
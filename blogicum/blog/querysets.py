@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils import timezone
-from django.db.models import Count
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
 
 class PostQuerySet(models.QuerySet):
@@ -15,4 +16,11 @@ class PostQuerySet(models.QuerySet):
         return self.select_related('author', 'category', 'location')
 
     def with_comment_count(self):
-        return self.annotate(comment_count=Count('comments'))
+        # Подзапрос вместо JOIN и GROUP BY: лента читается по индексу
+        # дат без временной сортировки (см. tests/test_query_plans.py).
+        comments = self.model._meta.get_field('comments').related_model
+        counts = comments.objects.filter(post=OuterRef('pk')).order_by(
+        ).values('post').annotate(count=Count('pk')).values('count')
+        return self.annotate(comment_count=Coalesce(
+            Subquery(counts, output_field=IntegerField()), 0
+        ))
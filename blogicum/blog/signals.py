@@ -0,0 +1,136 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from core.auth import (
+    USER_CACHE_FIELDS, invalidate_all_cached_users, invalidate_cached_user,
+)
+
+from .caching import (
+    bump_bulk_load, bump_lookups, bump_post, is_being_deleted,
+)
+from .existence import existence, invalidate_existence
+from .lookups import lookups
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Поля пользователя, которые выводятся на страницах блога.
+USER_DISPLAY_FIELDS = {
+    'username', 'first_name', 'last_name', 'is_staff', 'date_joined',
+}
+
+CACHED_USER_FIELDS = {*USER_CACHE_FIELDS, 'password'}
+
+
+def invalidate_after_load():
+    """Сбрасывает кеши целиком после загрузки данных без сигналов.
+
+    При loaddata (raw=True) связанные объекты могут ещё не существовать,
+    поэтому обработчики ниже пропускают такие сохранения, а загрузка
+    заканчивается этим вызовом: поколение справочников входит в ключи
+    всех страниц и карточек.
+    """
+    lookups.invalidate()
+    invalidate_existence()
+    invalidate_all_cached_users()
+    bump_bulk_load()
+
+
+def _post_owners(post_id):
+    return Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author_id'
+    ).first() or (None, None)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_owners(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    # Пост мог сменить категорию или автора: старые страницы тоже устарели.
+    instance._previous_owners = (
+        _post_owners(instance.pk) if instance.pk else (None, None)
+    )
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, created, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if created:
+        existence.add_post(instance.pk)
+    previous_slug, previous_author_id = instance._previous_owners
+    category_slug = instance.category.slug if instance.category_id else None
+    bump_post(
+        instance.pk,
+        category_slugs=(previous_slug, category_slug),
+        author_ids=(previous_author_id, instance.author_id),
+    )
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    previous_slug, previous_author_id = instance._previous_owners
+    bump_post(
+        instance.pk,
+        category_slugs=(previous_slug,),
+        author_ids=(previous_author_id,),
+    )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    if kwargs.get('raw'):
+        return
+    if is_being_deleted(instance.post_id):
+        return
+    # Число комментариев выводится в карточках всех лент.
+    category_slug, post_author_id = _post_owners(instance.post_id)
+    bump_post(
+        instance.post_id,
+        category_slugs=(category_slug,),
+        author_ids=(post_author_id,),
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_lookups(sender, **kwargs):
+    if kwargs.get('raw'):
+        return
+    lookups.invalidate()
+    bump_lookups()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user(
+    sender, instance, update_fields=None, created=False, raw=False, **kwargs
+):
+    if raw:
+        return
+    if created or update_fields is None or 'username' in update_fields:
+        existence.add_username(instance.username)
+    # Сюда же попадает смена пароля: сохранение без update_fields.
+    if update_fields is None or CACHED_USER_FIELDS.intersection(
+        update_fields
+    ):
+        invalidate_cached_user(instance.pk)
+    # Вход пользователя сохраняет только last_login — страницы не меняются.
+    if created or (
+        update_fields is not None
+        and not USER_DISPLAY_FIELDS.intersection(update_fields)
+    ):
+        return
+    bump_lookups()
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    bump_lookups()
@@ -0,0 +1,30 @@
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+from blog.caching import LOOKUPS, post_namespace
+from blog.lookups import attach_lookups
+from core.generations import versioned_key
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cached_post_card(context, post):
+    """Карточка поста из кеша горячих объектов.
+
+    Ключ включает поколения поста и справочников, поэтому правка поста,
+    комментария, категории или местоположения делает копию недоступной.
+    """
+    cache = caches['hot']
+    key = versioned_key('card', [post_namespace(post.id), LOOKUPS], post.id)
+    card = cache.get(key)
+    if card is None:
+        attach_lookups(post)
+        card = render_to_string(
+            'includes/post_card.html', {'post': post},
+            request=context.get('request'),
+        )
+        cache.set(key, card, settings.POST_CARD_CACHE_TIMEOUT)
+    return card
@@ -21,4 +21,5 @@ urlpatterns = [
          name='add_comment'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
          views.edit_comment, name='edit_comment'),
+    path('export/', views.export_view, name='export'),
 ]
@@ -3,9 +3,17 @@ from django.contrib.auth.models import User
 from django.contrib import messages
 from django.contrib.auth.views import LoginView
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.urls import reverse
-from django.http import Http404
-from .models import Post, Category, Comment
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from core.pagecache import cache_page_with_holes, mark_private
+from . import caching
+from .existence import existence, unless_missing
+from .export import (
+    EXPORTS, FORMATS, export_filename, export_stream, parse_since,
+)
+from .lookups import lookups
+from .models import Post, Comment
 from .forms import ProfileEditForm, CommentForm, PostForm
 from .utils.pagination import get_paginated_page
 
@@ -17,6 +25,9 @@ class BlogLoginView(LoginView):
         })
 
 
+@cache_page_with_holes(
+    stale_while_revalidate=True, depends_on=caching.index_dependencies
+)
 def index(request):
     posts = Post.objects.published().with_related().with_comment_count(
     ).order_by('-pub_date')  # Без указанной сортировки не проходят тесты :(
@@ -26,6 +37,10 @@ def index(request):
     })
 
 
+@unless_missing(existence.user_may_exist, 'Пользователь не найден')
+@cache_page_with_holes(
+    stale_while_revalidate=True, depends_on=caching.profile_dependencies
+)
 def profile_view(request, username):
     profile = get_object_or_404(User, username=username)
     posts = profile.posts.with_comment_count(
@@ -144,12 +159,15 @@ def edit_comment(request, post_id, comment_id):
     return redirect('blog:post_detail', post_id=post_id)
 
 
+@unless_missing(existence.post_may_exist, 'Пост не найден')
+@cache_page_with_holes(depends_on=caching.post_dependencies)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.with_related(), pk=post_id)
     if not post.is_published:
         if not request.user.is_authenticated or request.user != post.author:
             raise Http404("Пост не найден")
-    comments = post.comments.all().order_by('created_at')
+        mark_private(request)
+    comments = post.comments.select_related('author').order_by('created_at')
     form = CommentForm(request.POST or None)
     if form.is_valid() and request.user.is_authenticated:
         comment = form.save(commit=False)
@@ -165,16 +183,50 @@ def post_detail(request, post_id):
     })
 
 
+@cache_page_with_holes(
+    stale_while_revalidate=True, depends_on=caching.category_dependencies
+)
 def category_posts(request, category_slug):
-    category = get_object_or_404(
-        Category,
-        slug=category_slug,
-        is_published=True
-    )
-    posts = category.posts.published().with_comment_count().order_by(
+    category = lookups.published_category(category_slug)
+    if category is None:
+        raise Http404('Категория не найдена')
+    posts = category.posts.published().select_related(
+        'author'
+    ).with_comment_count().order_by(
         '-pub_date')  # Без указанной сортировки не проходят тесты :(
     page_obj = get_paginated_page(posts, request)
     return render(request, 'blog/category.html', {
         'category': category,
         'page_obj': page_obj,
     })
+
+
+@staff_member_required
+def export_view(request):
+    kind = request.GET.get('kind', 'all')
+    fmt = request.GET.get('format', 'ndjson')
+    compress = request.GET.get('gzip') == '1'
+    if kind not in (*EXPORTS, 'all') or fmt not in FORMATS:
+        return HttpResponseBadRequest('Неизвестная таблица или формат.')
+    kinds = list(EXPORTS) if kind == 'all' else [kind]
+    try:
+        since_id = request.GET.get('since_id')
+        since = request.GET.get('since')
+        stream = export_stream(
+            kinds, fmt, compress,
+            since_id=int(since_id) if since_id else None,
+            since=parse_since(since) if since else None,
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    response = StreamingHttpResponse(
+        stream,
+        content_type=(
+            'application/gzip' if compress
+            else 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        ),
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{export_filename(kinds, fmt, compress)}"'
+    )
+    return response
@@ -28,25 +28,106 @@ INSTALLED_APPS = [
     'django_bootstrap5',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
+    'core.apps.CoreConfig',
 ]
 
 MIDDLEWARE = [
+    'core.sampling.SamplingProfilerMiddleware',
+    'core.timing.ServerTimingMiddleware',
+    'core.metrics.MetricsMiddleware',
+    'core.slowqueries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.PrecompressedStaticMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.HTMLMinifyMiddleware',
+    'pages.middleware.PrerenderedPagesMiddleware',
+    'core.profiles.RouteProfileMiddleware',
+    'core.profiles.ProfiledSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiles.ProfiledCsrfViewMiddleware',
+    'core.auth.CachedAuthenticationMiddleware',
+    'core.profiles.ProfiledMessageMiddleware',
+    'core.profiles.ProfiledXFrameOptionsMiddleware',
+    'core.timing.ServerTimingViewMiddleware',
 ]
 
+# Профили middleware: какие из обёрток в core.profiles пропускаются
+# на лёгких маршрутах. Маршрут выбирается по префиксу пути или имени URL.
+MIDDLEWARE_PROFILES_ENABLED = True
+
+# Выборочный профилировщик: доля запросов от 0 до 1, 0 отключает его.
+# Свёрнутые стеки объединяет `python manage.py profile_report`.
+PROFILING_SAMPLE_RATE = 0
+
+# Чаще интервала переключения GIL (5 мс) поток выборки не просыпается.
+PROFILING_INTERVAL = 0.005
+
+PROFILING_DIR = BASE_DIR / 'profiles'
+
+# Заголовок Server-Timing и строка журнала core.timing с разбивкой
+# времени запроса на SQL, шаблоны, кеш и middleware.
+SERVER_TIMING = False
+
+# Метрики Prometheus на /metrics для администраторов. Процессы
+# gunicorn/uwsgi складывают значения через файлы в METRICS_DIR;
+# без него каждый процесс показывает только свои значения.
+METRICS_ENABLED = True
+
+METRICS_DIR = None
+
+# Сборщик без сессии передаёт заголовок `Authorization: Bearer <токен>`.
+METRICS_TOKEN = None
+
+# Запросы дольше порога (секунды) пишутся в журнал с планом выполнения;
+# None отключает журнал. Сводка: `python manage.py slow_queries`.
+SLOW_QUERY_THRESHOLD = 0.1
+
+SLOW_QUERY_LOG = BASE_DIR / 'logs' / 'slow_queries.jsonl'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'core.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'core.slowqueries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+    },
+}
+
+MIDDLEWARE_PROFILES = {
+    'bare': {'session', 'csrf', 'auth', 'messages'},
+    'public': {'csrf', 'messages'},
+}
+
+MIDDLEWARE_PROFILE_PATHS = {
+    '/static/': 'bare',
+}
+
+ROUTE_MIDDLEWARE_PROFILES = {
+    # Медиафайлы, подключённые через static() в blogicum/urls.py.
+    'django.views.static.serve': 'bare',
+    'pages:about': 'public',
+    'pages:rules': 'public',
+    'blog:index': 'public',
+    'blog:category_posts': 'public',
+    'blog:profile': 'public',
+}
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -74,6 +155,43 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'core.metrics.MeteredFileBasedCache',
+        'LOCATION': str(BASE_DIR / 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Общий уровень кеша 'hot'; отдельный каталог, чтобы clear() кеша
+    # 'hot' не удалял страницы и сессии из 'default'.
+    'hot_shared': {
+        'BACKEND': 'core.metrics.MeteredFileBasedCache',
+        'LOCATION': str(BASE_DIR / 'cache' / 'hot'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    # Горячие объекты: локальный LRU процесса поверх общего кеша.
+    'hot': {
+        'BACKEND': 'core.metrics.MeteredTwoTierCache',
+        'LOCATION': 'hot',
+        'KEY_PREFIX': 'hot',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'SHARED': 'hot_shared',
+            'MAX_ENTRIES': 2000,
+            'MAX_BYTES': 16 * 1024 * 1024,
+            'LOCAL_TIMEOUT': 30,
+            'GENERATION_CHECK_INTERVAL': 1,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -116,6 +234,92 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static'
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_collected'
+
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+HTML_MINIFY = True
+
+# Общий кеш страниц ленты; персональные фрагменты дорисовываются отдельно.
+PAGE_CACHE_TIMEOUT = 0 if DEBUG else 60 * 5
+
+# Одновременные промахи по одной странице строит один запрос,
+# остальные ждут его результат не дольше таймаута блокировки.
+PAGE_CACHE_SINGLE_FLIGHT = True
+
+PAGE_CACHE_LOCK_TIMEOUT = 10
+
+# Устаревшие страницы лент отдаются ещё столько секунд,
+# пока пул потоков строит свежую версию.
+PAGE_CACHE_STALE_TIMEOUT = 60 * 60
+
+PAGE_CACHE_REFRESH_WORKERS = 4
+
+PAGE_CACHE_REFRESH_QUEUE = 64
+
+# Счётчики поколений для ключей кеша (см. blog/caching.py).
+GENERATION_CACHE = 'hot'
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Битовая карта id постов и фильтр Блума имён пользователей для быстрого 404.
+EXISTENCE_INDEX_ENABLED = True
+
+EXISTENCE_INDEX_REBUILD_INTERVAL = 60 * 10
+
+# Как часто (секунды) сверять поколение индекса после загрузки данных
+# в обход сигналов в другом процессе.
+EXISTENCE_INDEX_CHECK_INTERVAL = 1
+
+EXISTENCE_INDEX_ERROR_RATE = 0.01
+
+# Страницы ошибок отдаются готовыми байтами: `manage.py prerender_pages`
+# сохраняет их на диск, иначе они отрисовываются при первой ошибке.
+# Авторизованным шапка дорисовывается для каждого запроса.
+PRERENDERED_ERROR_PAGES = not DEBUG
+
+# «О проекте» и «Правила» заготавливаются той же командой для анонимов
+# и для авторизованных; анонимам их отдаёт middleware до сессий.
+PRERENDERED_STATIC_PAGES = not DEBUG
+
+PRERENDERED_PAGES_MAX_AGE = 60 * 60 * 24
+
+PRERENDERED_PAGES_DIR = BASE_DIR / 'prerendered'
+
+# Bootstrap CSS: `python manage.py purge_css` собирает очищенную версию
+# и критический CSS; пока они не собраны, подключается полный файл.
+# Собранные файлы подхватываются без перезапуска сервера. При встроенном
+# критическом CSS основной файл загружается без блокировки отрисовки.
+BOOTSTRAP_CSS = 'css/bootstrap.min.css'
+
+PURGED_CSS = 'css/bootstrap.purged.css'
+
+CRITICAL_CSS = 'css/critical.css'
+
+USE_PURGED_CSS = True
+
+CRITICAL_CSS_TEMPLATES = [
+    'base.html',
+    'includes/header.html',
+    'includes/footer.html',
+]
+
+CSS_PURGE_FORMS = [
+    'blog.forms.PostForm',
+    'blog.forms.CommentForm',
+    'blog.forms.ProfileEditForm',
+    'django.contrib.auth.forms.AuthenticationForm',
+    'django.contrib.auth.forms.UserCreationForm',
+    'django.contrib.auth.forms.PasswordResetForm',
+]
+
+# Классы, которые появляются только из JavaScript или состояний формы.
+CSS_PURGE_SAFELIST = [
+    'active', 'disabled', 'show', 'fade', 'collapsing',
+    'is-invalid', 'is-valid', 'invalid-feedback', 'valid-feedback',
+    'was-validated', 'alert', 'alert-success', 'alert-danger',
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -123,6 +327,31 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
+# Хранилище сессий. Без cookie сессия не загружается ни в одном из них;
+# cached_db читает базу только при промахе кеша, signed_cookies не
+# обращается к ней вовсе. Сравнение: `python manage.py bench_sessions`.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_STORAGE = 'cached_db'
+
+SESSION_ENGINE = SESSION_ENGINES[SESSION_STORAGE]
+
+# Сообщения живут только в подписанной cookie и не пишутся в сессию.
+MESSAGE_STORAGE = 'core.messages.SignedCookieStorage'
+
+MESSAGE_COOKIE_MAX_SIZE = 2048
+
+MESSAGE_MAX_LENGTH = 200
+
+# Пользователь сессии кешируется по id и хешу сессии (core/auth.py).
+USER_CACHE = 'hot'
+
+USER_CACHE_TIMEOUT = 60 * 60
+
 LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'blog:profile'
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model,
+)
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import SimpleLazyObject
+
+from .generations import bump_generations, versioned_key
+from .profiles import ProfiledAuthenticationMiddleware
+
+# Поля, которых хватает шаблонам и проверкам прав. Остальные поля,
+# включая пароль, у закешированного пользователя отложенные и при
+# обращении дочитываются из базы.
+USER_CACHE_FIELDS = (
+    'id', 'username', 'first_name', 'last_name', 'email',
+    'is_active', 'is_staff', 'is_superuser',
+)
+
+USER_CACHE_PREFIX = 'auth-user'
+
+# Общее поколение для сброса всех пользователей после массовой загрузки.
+USERS = 'users'
+
+
+def user_namespace(user_id):
+    return f'user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    bump_generations([user_namespace(user_id)])
+
+
+def invalidate_all_cached_users():
+    bump_generations([USERS])
+
+
+def _record(user):
+    return {field: getattr(user, field) for field in USER_CACHE_FIELDS}
+
+
+def _from_record(record):
+    # from_db ждёт значения в порядке полей модели.
+    fields = [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.attname in record
+    ]
+    return get_user_model().from_db(
+        DEFAULT_DB_ALIAS, fields, [record[field] for field in fields]
+    )
+
+
+def get_cached_user(request):
+    """Пользователь сессии из кеша, без запроса к auth_user.
+
+    Ключ содержит id пользователя и хеш сессии; запись сбрасывается
+    поколением при любом сохранении пользователя, в том числе при
+    смене пароля, после чего проверка сессии проходит заново.
+    """
+    session = request.session
+    try:
+        user_id = session[SESSION_KEY]
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth.get_user(request)
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth.get_user(request)
+    cache = caches[settings.USER_CACHE]
+    key = versioned_key(
+        USER_CACHE_PREFIX, [user_namespace(user_id), USERS],
+        user_id, session.get(HASH_SESSION_KEY),
+    )
+    record = cache.get(key)
+    if record is not None:
+        return _from_record(record)
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        cache.set(key, _record(user), settings.USER_CACHE_TIMEOUT)
+    return user
+
+
+class CachedAuthenticationMiddleware(ProfiledAuthenticationMiddleware):
+    """AuthenticationMiddleware, читающий пользователя через кеш."""
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
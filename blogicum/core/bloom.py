@@ -0,0 +1,71 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """Вероятностное множество строк: без ложноотрицательных ответов."""
+
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    @property
+    def memory(self):
+        return len(self.bits)
+
+    @property
+    def false_positive_rate(self):
+        """Оценка вероятности ложного срабатывания при текущем заполнении."""
+        return (
+            1 - math.exp(-self.hash_count * self.count / self.size)
+        ) ** self.hash_count
+
+
+class IdBitmap:
+    """Точное множество неотрицательных целых: один бит на значение."""
+
+    def __init__(self, max_id=0):
+        self.bits = bytearray(max_id // 8 + 1)
+        self.count = 0
+
+    def add(self, value):
+        byte = value >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte - len(self.bits) + 1))
+        if not self.bits[byte] & (1 << (value & 7)):
+            self.bits[byte] |= 1 << (value & 7)
+            self.count += 1
+
+    def __contains__(self, value):
+        byte = value >> 3
+        return (
+            0 <= byte < len(self.bits)
+            and bool(self.bits[byte] & (1 << (value & 7)))
+        )
+
+    @property
+    def memory(self):
+        return len(self.bits)
@@ -0,0 +1,33 @@
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Max
+
+
+def batched(iterable, size):
+    """Разбивает поток объектов на списки не длиннее size."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def next_id(model, using=DEFAULT_DB_ALIAS):
+    """Первый свободный id: bulk_create на SQLite не возвращает ключи."""
+    last = model._default_manager.using(using).aggregate(
+        last=Max('pk')
+    )['last']
+    return (last or 0) + 1
+
+
+def reset_sequences(models, using=DEFAULT_DB_ALIAS):
+    """Сдвигает последовательности после вставки с явными id."""
+    connection = connections[using]
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
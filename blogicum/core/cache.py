@@ -0,0 +1,291 @@
+import os
+import pickle
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+
+_MISSING = object()
+
+
+class AtomicFileBasedCache(FileBasedCache):
+    """FileBasedCache с атомарными между процессами add и incr.
+
+    В FileBasedCache это has_key + set и get + set: два процесса могут
+    оба взять блокировку или потерять увеличение счётчика. Здесь обе
+    операции выполняются под файлом-замком ключа, который создаётся
+    с O_CREAT | O_EXCL. Замок старше LOCK_TIMEOUT секунд считается
+    брошенным упавшим процессом и снимается.
+    """
+
+    lock_suffix = '.lock'
+
+    def __init__(self, dir, params):
+        super().__init__(dir, params)
+        self._lock_timeout = params.get('OPTIONS', {}).get('LOCK_TIMEOUT', 10)
+
+    @contextmanager
+    def _file_lock(self, fname):
+        path = fname + self.lock_suffix
+        while True:
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileNotFoundError:
+                self._createdir()
+                continue
+            except FileExistsError:
+                try:
+                    age = time.time() - os.path.getmtime(path)
+                except FileNotFoundError:
+                    continue
+                if age > self._lock_timeout:
+                    self._delete(path)
+                else:
+                    time.sleep(0.001)
+                continue
+            os.close(fd)
+            break
+        try:
+            yield
+        finally:
+            self._delete(path)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._file_lock(self._key_to_file(key, version)):
+            if FileBasedCache.has_key(self, key, version):  # noqa: W601
+                return False
+            FileBasedCache.set(self, key, value, timeout, version)
+            return True
+
+    def incr(self, key, delta=1, version=None):
+        fname = self._key_to_file(key, version)
+        with self._file_lock(fname):
+            try:
+                with open(fname, 'rb') as f:
+                    expiry = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except (FileNotFoundError, EOFError):
+                expiry = value = None
+            if value is None or expiry is not None and expiry < time.time():
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            # В отличие от BaseCache.incr срок хранения ключа сохраняется.
+            FileBasedCache.set(
+                self, key, value,
+                None if expiry is None else expiry - time.time(), version,
+            )
+            return value
+
+
+class _LocalTier:
+    """LRU-кеш процесса с ограничением по числу записей и объёму."""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.entries = OrderedDict()
+        self.size = 0
+        # namespace -> (поколение, время последней сверки с общим уровнем)
+        self.generations = {}
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._delete(key)
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, pickled, expires_at, generation):
+        if len(pickled) > self.max_bytes:
+            return
+        with self.lock:
+            self._delete(key)
+            self.entries[key] = (pickled, expires_at, generation)
+            self.size += len(pickled)
+            while (
+                len(self.entries) > self.max_entries
+                or self.size > self.max_bytes
+            ):
+                self._delete(next(iter(self.entries)))
+
+    def delete_where(self, predicate):
+        with self.lock:
+            for key in [key for key in self.entries if predicate(key)]:
+                self._delete(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generations.clear()
+            self.size = 0
+
+    def _delete(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+_local_tiers = {}
+_local_tiers_lock = Lock()
+
+
+class TwoTierCache(BaseCache):
+    """Локальный LRU процесса перед общим бэкендом кеша.
+
+    Записи хранятся в общем уровне (`OPTIONS['SHARED']` — отдельный алиас
+    из CACHES: clear() очищает его целиком). delete и incr увеличивают
+    счётчик поколения пространства имён ключа (часть ключа до последнего
+    двоеточия); процессы сверяют его не чаще раза в
+    GENERATION_CHECK_INTERVAL секунд и выбрасывают локальные копии
+    устаревших поколений. set и add поколение не трогают, чтобы запись
+    одного ключа не сбрасывала соседей во всех процессах: перезапись
+    существующего ключа другие процессы увидят через LOCAL_TIMEOUT,
+    поэтому изменяемые значения удаляются или кладутся под новым ключом.
+    Атомарность incr и add между процессами обеспечивает общий уровень.
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED', 'default')
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 30)
+        self._generation_check_interval = options.get(
+            'GENERATION_CHECK_INTERVAL', 1
+        )
+        with _local_tiers_lock:
+            self._local = _local_tiers.setdefault(name, _LocalTier(
+                max_entries=self._max_entries,
+                max_bytes=options.get('MAX_BYTES', 16 * 1024 * 1024),
+            ))
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    @staticmethod
+    def namespace(key):
+        return key.rpartition(':')[0] or key
+
+    def _generation_key(self, namespace):
+        return f'__generation__:{namespace}'
+
+    def generation(self, namespace):
+        now = time.monotonic()
+        known = self._local.generations.get(namespace)
+        if known is not None and (
+            now - known[1] < self._generation_check_interval
+        ):
+            return known[0]
+        generation = self.shared.get(self._generation_key(namespace), 0)
+        if known is not None and known[0] != generation:
+            self._drop_namespace(namespace)
+        self._local.generations[namespace] = (generation, now)
+        return generation
+
+    def bump_generation(self, namespace):
+        generation_key = self._generation_key(namespace)
+        try:
+            generation = self.shared.incr(generation_key)
+        except ValueError:
+            if self.shared.add(generation_key, 1, None):
+                generation = 1
+            else:
+                generation = self.shared.incr(generation_key)
+        # incr у многих бэкендов сбрасывает срок хранения на умолчательный.
+        self.shared.touch(generation_key, None)
+        self._drop_namespace(namespace)
+        self._local.generations[namespace] = (generation, time.monotonic())
+        return generation
+
+    def _drop_namespace(self, namespace):
+        self._local.delete_where(lambda key: self.namespace(key) == namespace)
+
+    def _shared_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _remember(self, full_key, value, timeout, generation):
+        local_timeout = self._local_timeout
+        backend_timeout = self.get_backend_timeout(timeout)
+        if backend_timeout is not None:
+            local_timeout = min(local_timeout, backend_timeout - time.time())
+        self._local.set(
+            full_key,
+            pickle.dumps(value, self.pickle_protocol),
+            time.monotonic() + local_timeout,
+            generation,
+        )
+
+    def get(self, key, default=None, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        generation = self.generation(self.namespace(full_key))
+        entry = self._local.get(full_key)
+        if entry is not None and entry[2] == generation:
+            return pickle.loads(entry[0])
+        value = self.shared.get(full_key, _MISSING)
+        if value is _MISSING:
+            return default
+        self._remember(full_key, value, DEFAULT_TIMEOUT, generation)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        self.shared.set(full_key, value, self._shared_timeout(timeout))
+        self._remember(
+            full_key, value, timeout,
+            self.generation(self.namespace(full_key)),
+        )
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        if not self.shared.add(
+            full_key, value, self._shared_timeout(timeout)
+        ):
+            return False
+        self._remember(
+            full_key, value, timeout,
+            self.generation(self.namespace(full_key)),
+        )
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        return self.shared.touch(full_key, self._shared_timeout(timeout))
+
+    def delete(self, key, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        deleted = self.shared.delete(full_key)
+        self.bump_generation(self.namespace(full_key))
+        return deleted
+
+    def incr(self, key, delta=1, version=None):
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        value = self.shared.incr(full_key, delta)
+        self.bump_generation(self.namespace(full_key))
+        return value
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version=version) is not _MISSING
+
+    def clear(self):
+        # Вместе с записями пропадают и счётчики поколений, поэтому
+        # другие процессы сбросят свои копии при ближайшей сверке.
+        self.shared.clear()
+        self._local.clear()
@@ -0,0 +1,42 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+# Форматы, которые уже сжаты: повторное сжатие только тратит CPU.
+INCOMPRESSIBLE_EXTENSIONS = (
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.woff', '.woff2',
+    '.gz', '.br', '.zip',
+)
+# Ответы с таким содержимым уже сжаты.
+COMPRESSED_CONTENT_TYPES = (
+    'application/gzip', 'application/zip', 'image/', 'video/', 'audio/',
+)
+MIN_COMPRESS_SIZE = 200
+
+
+def has_brotli():
+    return brotli is not None
+
+
+def gzip_compress(data):
+    # mtime=0 делает результат детерминированным для одинакового входа.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def brotli_compress(data):
+    return brotli.compress(data, quality=11)
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encodings = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        if name:
+            encodings.add(name.lower())
+    return encodings
@@ -0,0 +1,164 @@
+import re
+
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.DOTALL)
+TEMPLATE_SYNTAX_RE = re.compile(r'{%.*?%}|{{.*?}}|{#.*?#}', re.DOTALL)
+ID_ATTR_RE = re.compile(r'\bid\s*=\s*(["\'])([^"\'{}]+)\1')
+TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)')
+NAME_RE = re.compile(r'^-?[_a-zA-Z][\w-]*$')
+
+SELECTOR_ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+SELECTOR_PSEUDO_RE = re.compile(r'::?[\w-]+(\([^)]*\))?')
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+SELECTOR_ID_RE = re.compile(r'#(-?[_a-zA-Z][\w-]*)')
+SELECTOR_TAG_RE = re.compile(r'(?<![\w.#-])([a-zA-Z][\w-]*)')
+
+# Внутри этих @-правил не селекторы, а объявления или кадры анимации.
+OPAQUE_AT_RULES = ('@font-face', '@keyframes', '@-webkit-keyframes', '@page')
+
+
+class UsedSelectors:
+    """Имена классов, id и тегов, встречающиеся в разметке."""
+
+    def __init__(self, classes=(), ids=(), tags=()):
+        self.classes = set(classes)
+        self.ids = set(ids)
+        self.tags = {tag.lower() for tag in tags}
+
+    def update_from_html(self, html):
+        for _, value in CLASS_ATTR_RE.findall(html):
+            # Классы из {% if %}-веток тоже считаются используемыми.
+            value = TEMPLATE_SYNTAX_RE.sub(
+                lambda match: ' ' + ' '.join(
+                    re.findall(r'["\']([^"\']*)["\']', match.group())
+                ) + ' ',
+                value,
+            )
+            self.classes.update(
+                name for name in value.split() if NAME_RE.match(name)
+            )
+        self.ids.update(value for _, value in ID_ATTR_RE.findall(html))
+        self.tags.update(tag.lower() for tag in TAG_RE.findall(html))
+
+    def matches(self, selector):
+        selector = SELECTOR_ATTRIBUTE_RE.sub('', selector)
+        selector = SELECTOR_PSEUDO_RE.sub('', selector)
+        if not all(
+            name in self.classes
+            for name in SELECTOR_CLASS_RE.findall(selector)
+        ):
+            return False
+        if not all(
+            name in self.ids for name in SELECTOR_ID_RE.findall(selector)
+        ):
+            return False
+        selector = SELECTOR_CLASS_RE.sub(' ', selector)
+        selector = SELECTOR_ID_RE.sub(' ', selector)
+        return all(
+            name.lower() in self.tags
+            for name in SELECTOR_TAG_RE.findall(selector)
+        )
+
+
+def split_selectors(prelude):
+    selectors = []
+    depth = 0
+    start = 0
+    for position, char in enumerate(prelude):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:position])
+            start = position + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def _skip_string_or_comment(css, position):
+    char = css[position]
+    if char in '"\'':
+        end = position + 1
+        while end < len(css) and css[end] != char:
+            end += 2 if css[end] == '\\' else 1
+        return end + 1
+    if css.startswith('/*', position):
+        end = css.find('*/', position + 2)
+        return len(css) if end == -1 else end + 2
+    return None
+
+
+def _find_block_end(css, start):
+    """Индекс символа после `}`, закрывающего блок, открытый в `start`."""
+    depth = 0
+    position = start
+    while position < len(css):
+        skipped = _skip_string_or_comment(css, position)
+        if skipped is not None:
+            position = skipped
+            continue
+        if css[position] == '{':
+            depth += 1
+        elif css[position] == '}':
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        position += 1
+    return len(css)
+
+
+def parse_css(css):
+    """Разбивает таблицу стилей на (прелюдия, тело) верхнего уровня.
+
+    Для `@charset` и других правил без блока тело равно None.
+    """
+    nodes = []
+    position = 0
+    prelude_start = 0
+    while position < len(css):
+        skipped = _skip_string_or_comment(css, position)
+        if skipped is not None:
+            if css.startswith('/*', position):
+                # Комментарии не переносятся в результат.
+                css = css[:position] + css[skipped:]
+                continue
+            position = skipped
+            continue
+        char = css[position]
+        if char == ';':
+            prelude = css[prelude_start:position].strip()
+            if prelude:
+                nodes.append((prelude, None))
+            prelude_start = position = position + 1
+        elif char == '{':
+            end = _find_block_end(css, position)
+            nodes.append((
+                css[prelude_start:position].strip(),
+                css[position + 1:end - 1],
+            ))
+            prelude_start = position = end
+        else:
+            position += 1
+    return nodes
+
+
+def purge_css(css, used):
+    """Оставляет только правила, селекторы которых встречаются в разметке."""
+    result = []
+    for prelude, body in parse_css(css):
+        if body is None:
+            result.append(prelude + ';')
+        elif prelude.startswith(OPAQUE_AT_RULES):
+            result.append(f'{prelude}{{{body}}}')
+        elif prelude.startswith('@'):
+            purged_body = purge_css(body, used)
+            if purged_body:
+                result.append(f'{prelude}{{{purged_body}}}')
+        else:
+            selectors = [
+                selector for selector in split_selectors(prelude)
+                if used.matches(selector)
+            ]
+            if selectors:
+                result.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(result)
@@ -0,0 +1,232 @@
+"""Потоковая загрузка фикстур в формате dumpdata через bulk_create.
+
+loaddata сохраняет каждый объект отдельным save(); здесь объекты читаются
+из JSON-массива по одному, копятся пачками по моделям и вставляются
+в порядке зависимостей внешних ключей. Существующие строки обновляются,
+как и в loaddata.
+"""
+import json
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core import serializers
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_save, pre_save
+
+from .bulk import reset_sequences
+
+READ_SIZE = 64 * 1024
+
+
+class _ArrayReader:
+    """Читает элементы JSON-массива порциями из файла."""
+
+    def __init__(self, fp, read_size):
+        self.fp = fp
+        self.read_size = read_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+
+    def fill(self):
+        if len(self.buffer) - self.position >= self.read_size:
+            # Объект длиннее порции: читаем всё большими порциями.
+            self.read_size *= 2
+        chunk = self.fp.read(self.read_size)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+
+    def next_char(self):
+        """Первый значимый символ; разделители пропускаются."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in ' \t\r\n,'
+            ):
+                self.position += 1
+            if self.position < len(self.buffer) or self.eof:
+                return self.buffer[self.position:self.position + 1]
+            self.fill()
+
+    def decode(self):
+        while True:
+            try:
+                item, end = self.decoder.raw_decode(
+                    self.buffer, self.position
+                )
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # Число на границе порции могло прочитаться не целиком.
+                if self.eof or end < len(self.buffer):
+                    self.position = end
+                    return item
+            self.fill()
+
+
+def iter_json_array(fp, read_size=READ_SIZE):
+    """Объекты JSON-массива по одному, не читая файл целиком."""
+    reader = _ArrayReader(fp, read_size)
+    if reader.next_char() != '[':
+        raise ValueError('Фикстура должна быть JSON-массивом.')
+    reader.position += 1
+    while True:
+        char = reader.next_char()
+        if char == ']':
+            return
+        if not char:
+            raise ValueError('Фикстура обрывается до конца массива.')
+        yield reader.decode()
+
+
+def dependency_order(models):
+    """Модели так, чтобы связанные через внешний ключ шли раньше."""
+    models = list(models)
+    ordered = []
+    visiting = set()
+
+    def visit(model):
+        if model in ordered or model in visiting:
+            return
+        visiting.add(model)
+        for field in model._meta.concrete_fields:
+            related = field.related_model if field.is_relation else None
+            if related is not None and related in models:
+                visit(related)
+        visiting.discard(model)
+        ordered.append(model)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+@contextmanager
+def fixture_dates(model):
+    """Отключает auto_now и auto_now_add, чтобы даты брались из фикстуры.
+
+    bulk_create вызывает pre_save полей, и без этого каждая запись
+    получила бы текущее время вместо сохранённого в дампе.
+    """
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class FixtureLoader:
+    """Загружает объекты пачками; сигналы моделей по умолчанию не шлются."""
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=5000,
+                 send_signals=False):
+        self.using = using
+        self.batch_size = batch_size
+        self.send_signals = send_signals
+        self.buffers = defaultdict(list)
+        self.buffered = 0
+        self.deferred = []
+        self.counts = defaultdict(int)
+
+    def load(self, fp):
+        connection = connections[self.using]
+        started = time.perf_counter()
+        with connection.constraint_checks_disabled():
+            for record in iter_json_array(fp):
+                self.add(record)
+                if self.buffered >= self.batch_size:
+                    self.flush()
+            self.flush()
+            for deserialized in self.deferred:
+                deserialized.save_deferred_fields(using=self.using)
+        models = list(self.counts)
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in models]
+        )
+        reset_sequences(models, using=self.using)
+        return time.perf_counter() - started
+
+    def add(self, record):
+        for deserialized in serializers.deserialize(
+            'python', [record], using=self.using,
+            handle_forward_references=True,
+        ):
+            if deserialized.deferred_fields:
+                self.deferred.append(deserialized)
+            self.buffers[type(deserialized.object)].append(deserialized)
+            self.buffered += 1
+
+    def flush(self):
+        for model in dependency_order(self.buffers):
+            with transaction.atomic(using=self.using):
+                self.save_batch(model, self.buffers.pop(model))
+        self.buffered = 0
+
+    def save_batch(self, model, batch):
+        objects = [deserialized.object for deserialized in batch]
+        existing = set(
+            model._base_manager.using(self.using).filter(
+                pk__in=[obj.pk for obj in objects if obj.pk is not None]
+            ).values_list('pk', flat=True)
+        )
+        if self.send_signals:
+            for obj in objects:
+                pre_save.send(
+                    sender=model, instance=obj, raw=True, using=self.using,
+                    update_fields=None,
+                )
+        new = [obj for obj in objects if obj.pk not in existing]
+        old = [obj for obj in objects if obj.pk in existing]
+        manager = model._base_manager.using(self.using)
+        with fixture_dates(model):
+            manager.bulk_create(new)
+        if old:
+            manager.bulk_update(old, [
+                field.name for field in model._meta.concrete_fields
+                if not field.primary_key
+            ])
+        self.save_m2m(model, batch, existing)
+        if self.send_signals:
+            for obj in objects:
+                post_save.send(
+                    sender=model, instance=obj, created=obj.pk not in existing,
+                    update_fields=None, raw=True, using=self.using,
+                )
+        self.counts[model] += len(objects)
+
+    def save_m2m(self, model, batch, existing):
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            if not through._meta.auto_created:
+                continue
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            rows = []
+            updated = []
+            for deserialized in batch:
+                values = (deserialized.m2m_data or {}).get(field.name)
+                if values is None:
+                    continue
+                pk = deserialized.object.pk
+                if pk in existing:
+                    updated.append(pk)
+                rows.extend(
+                    through(**{source: pk, target: value}) for value in values
+                )
+            manager = through._base_manager.using(self.using)
+            if updated:
+                manager.filter(**{source + '__in': updated}).delete()
+            manager.bulk_create(rows)
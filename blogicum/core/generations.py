@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+GENERATION_PREFIX = 'gen'
+
+
+def _cache():
+    return caches[settings.GENERATION_CACHE]
+
+
+def _key(namespace):
+    return f'{GENERATION_PREFIX}:{namespace}'
+
+
+def _initial():
+    # Если счётчик вытеснен из кеша, он не должен начаться заново с нуля,
+    # иначе совпадёт с давно устаревшими ключами.
+    return time.time_ns() // 1000
+
+
+def get_generations(namespaces):
+    cache = _cache()
+    keys = {namespace: _key(namespace) for namespace in namespaces}
+    found = cache.get_many(list(keys.values()))
+    generations = {}
+    for namespace, key in keys.items():
+        if key not in found:
+            cache.add(key, _initial(), None)
+            found[key] = cache.get(key, 0)
+        generations[namespace] = found[key]
+    return generations
+
+
+def bump_generations(namespaces):
+    """Инвалидирует всё, что закешировано с этими поколениями, за O(1).
+
+    Увеличение атомарно, если атомарны incr и add общего уровня кеша
+    (core.cache.AtomicFileBasedCache).
+    """
+    cache = _cache()
+    for namespace in set(namespaces):
+        key = _key(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Счётчик мог одновременно создать другой процесс.
+            if not cache.add(key, _initial(), None):
+                cache.incr(key)
+
+
+def versioned_key(prefix, namespaces, *parts):
+    """Ключ кеша, в который встроены текущие поколения пространств имён."""
+    generations = get_generations(namespaces)
+    versions = ','.join(
+        f'{namespace}={generations[namespace]}' for namespace in namespaces
+    )
+    return ':'.join([prefix, *map(str, parts), versions])
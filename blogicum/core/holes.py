@@ -0,0 +1,56 @@
+import base64
+import json
+import re
+
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+HOLE_RE = re.compile(r'<!--hole:([A-Za-z0-9_=-]+)-->')
+
+_context_factories = {}
+
+
+def register_hole(template_name):
+    """Регистрирует функцию, дополняющую контекст фрагмента.
+
+    Функция получает request и аргументы тега `{% hole %}` и возвращает
+    словарь, который добавляется к контексту при заполнении дыры.
+    """
+    def decorator(factory):
+        _context_factories[template_name] = factory
+        return factory
+    return decorator
+
+
+def is_punching(request):
+    return getattr(request, 'punch_holes', False)
+
+
+def make_marker(template_name, kwargs):
+    payload = json.dumps([template_name, kwargs], separators=(',', ':'))
+    token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+    return mark_safe(f'<!--hole:{token}-->')
+
+
+def render_hole(request, template_name, kwargs):
+    context = dict(kwargs)
+    factory = _context_factories.get(template_name)
+    if factory is not None:
+        context.update(factory(request, **kwargs))
+    return render_to_string(template_name, context, request=request)
+
+
+def fill_holes(content, request):
+    """Подставляет в общую закешированную страницу фрагменты пользователя."""
+    rendered = {}
+
+    def replace(match):
+        token = match.group(1)
+        if token not in rendered:
+            template_name, kwargs = json.loads(
+                base64.urlsafe_b64decode(token.encode('ascii'))
+            )
+            rendered[token] = render_hole(request, template_name, kwargs)
+        return rendered[token]
+
+    return HOLE_RE.sub(replace, content)
@@ -0,0 +1,184 @@
+"""Нагрузочное тестирование приложения внутри процесса.
+
+Сценарии регистрируются декоратором `scenario` в модулях `loadtest.py`
+приложений и выполняются через тестовый клиент Django: каждый запрос
+записывается под именем своего маршрута вместе с временем ответа
+и числом SQL-запросов.
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+_scenarios = {}
+_setups = []
+
+
+def scenario(weight=1):
+    """Регистрирует сценарий; вес задаёт долю его запусков."""
+    def decorator(func):
+        _scenarios[func.__name__] = (func, weight)
+        return func
+    return decorator
+
+
+def setup(func):
+    """Регистрирует функцию, готовящую общие данные для сценариев."""
+    _setups.append(func)
+    return func
+
+
+def scenarios():
+    return dict(_scenarios)
+
+
+def _host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host != '*']
+    return hosts[0].lstrip('.') if hosts else 'localhost'
+
+
+def percentile(values, fraction):
+    """Процентиль по ближайшему рангу для отсортированного списка."""
+    if not values:
+        return None
+    index = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+class Recorder:
+    """Собирает время ответа и число SQL-запросов по именам маршрутов."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.runs = defaultdict(int)
+
+    def record(self, view_name, seconds, queries, status):
+        with self._lock:
+            self.samples[view_name].append((seconds, queries))
+            if status >= 400:
+                self.errors[view_name] += 1
+
+    def count_run(self, name):
+        with self._lock:
+            self.runs[name] += 1
+
+    def summary(self, elapsed):
+        urls = {}
+        for view_name, samples in sorted(self.samples.items()):
+            latencies = sorted(seconds * 1000 for seconds, _ in samples)
+            urls[view_name] = {
+                'requests': len(samples),
+                'errors': self.errors[view_name],
+                'p50_ms': percentile(latencies, 0.5),
+                'p95_ms': percentile(latencies, 0.95),
+                'p99_ms': percentile(latencies, 0.99),
+                'requests_per_second': len(samples) / elapsed,
+                'queries_per_request': (
+                    sum(queries for _, queries in samples) / len(samples)
+                ),
+            }
+        return {
+            'elapsed_seconds': elapsed,
+            'requests': sum(len(samples) for samples in self.samples.values()),
+            'scenarios': dict(self.runs),
+            'urls': urls,
+        }
+
+
+class Session:
+    """Клиенты одного потока нагрузки и общие данные сценариев."""
+
+    def __init__(self, recorder, rng, data):
+        self.recorder = recorder
+        self.random = rng
+        self.data = data
+        self.client = Client(HTTP_HOST=_host())
+        self._user_clients = {}
+
+    def client_for(self, user):
+        if user is None:
+            return self.client
+        if user.pk not in self._user_clients:
+            client = Client(HTTP_HOST=_host())
+            client.force_login(user)
+            self._user_clients[user.pk] = client
+        return self._user_clients[user.pk]
+
+    def get(self, view_name, *args, data=None, user=None):
+        return self.request('get', view_name, args, data, user)
+
+    def post(self, view_name, *args, data=None, user=None):
+        return self.request('post', view_name, args, data, user)
+
+    def request(self, method, view_name, args, data, user):
+        client = self.client_for(user)
+        url = reverse(view_name, args=args)
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with connection.execute_wrapper(count):
+            response = getattr(client, method)(url, data or {})
+        self.recorder.record(
+            view_name, time.perf_counter() - started, queries,
+            response.status_code,
+        )
+        return response
+
+
+def run(iterations, concurrency=1, seed=None, names=None):
+    """Выполняет сценарии, выбирая их случайно по весам."""
+    selected = {
+        name: value for name, value in _scenarios.items()
+        if not names or name in names
+    }
+    if not selected:
+        raise ValueError('Нет сценариев для запуска.')
+    data = {}
+    for func in _setups:
+        data.update(func())
+    recorder = Recorder()
+    weights = [weight for _, weight in selected.values()]
+    per_worker = [
+        iterations // concurrency + (index < iterations % concurrency)
+        for index in range(concurrency)
+    ]
+
+    def work(index):
+        rng = random.Random(None if seed is None else seed + index)
+        session = Session(recorder, rng, data)
+        for _ in range(per_worker[index]):
+            [name] = rng.choices(list(selected), weights)
+            recorder.count_run(name)
+            selected[name][0](session)
+
+    def work_in_thread(index):
+        try:
+            work(index)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        work(0)
+    else:
+        workers = [
+            threading.Thread(target=work_in_thread, args=(index,))
+            for index in range(concurrency)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    return recorder.summary(time.perf_counter() - started)
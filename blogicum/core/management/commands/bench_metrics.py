@@ -0,0 +1,64 @@
+import tempfile
+import time
+import timeit
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.metrics import registry, request_latency, responses
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет стоимость записи метрик и число запросов в секунду '
+        'с MetricsMiddleware и без него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for store, metrics_dir in (('память', None), ('mmap', directory)):
+                with override_settings(METRICS_DIR=metrics_dir):
+                    registry.reset()
+                    self.measure_operations(store)
+        registry.reset()
+        for url in (reverse('pages:about'), reverse('blog:index')):
+            results = []
+            for enabled in (False, True):
+                with override_settings(
+                    METRICS_ENABLED=enabled, ALLOWED_HOSTS=['localhost']
+                ):
+                    # Набор middleware собирается при создании клиента.
+                    client = Client(HTTP_HOST='localhost')
+                    results.append(
+                        self.measure(client, url, options['requests'])
+                    )
+            before, after = results
+            self.stdout.write(
+                f'{url}: {before:.0f} -> {after:.0f} запросов/с '
+                f'({(after / before - 1) * 100:+.1f}%)'
+            )
+
+    def measure_operations(self, store):
+        operations = {
+            'Counter.inc': lambda: responses.inc(view='bench', status=200),
+            'Histogram.observe': lambda: request_latency.observe(
+                0.042, view='bench'
+            ),
+        }
+        for name, operation in operations.items():
+            timer = timeit.Timer(operation)
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat=5, number=number)) / number
+            self.stdout.write(f'{name} ({store}): {best * 1e6:.2f} мкс')
+
+    def measure(self, client, url, count):
+        # Первый запрос прогревает кеши и не учитывается.
+        client.get(url)
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get(url)
+        return count / (time.perf_counter() - started)
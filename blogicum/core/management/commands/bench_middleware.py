@@ -0,0 +1,65 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Category
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает число запросов в секунду к статическим страницам '
+        'и лентам с профилями middleware и без них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--user',
+            help='Имя пользователя, от которого выполняются запросы.',
+        )
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        if options['user']:
+            user = get_user_model().objects.filter(
+                username=options['user']
+            ).first()
+            if user is None:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден.'
+                )
+            client.force_login(user)
+        for url in self.urls():
+            results = []
+            for enabled in (False, True):
+                with override_settings(MIDDLEWARE_PROFILES_ENABLED=enabled):
+                    results.append(
+                        self.measure(client, url, options['requests'])
+                    )
+            before, after = results
+            self.stdout.write(
+                f'{url}: {before:.0f} -> {after:.0f} запросов/с '
+                f'({(after / before - 1) * 100:+.1f}%)'
+            )
+
+    def urls(self):
+        urls = [
+            reverse('pages:about'),
+            reverse('pages:rules'),
+            reverse('blog:index'),
+        ]
+        category = Category.objects.filter(is_published=True).first()
+        if category is not None:
+            urls.append(reverse('blog:category_posts', args=[category.slug]))
+        return urls
+
+    def measure(self, client, url, count):
+        # Первый запрос прогревает кеши и не учитывается.
+        client.get(url)
+        started = time.perf_counter()
+        for _ in range(count):
+            client.get(url)
+        return count / (time.perf_counter() - started)
@@ -0,0 +1,63 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+STALE_SESSION_KEY = 'x' * 32
+
+
+class Command(BaseCommand):
+    help = (
+        'Считает SQL-запросы на анонимный запрос, в том числе к таблице '
+        'сессий, для каждого хранилища сессий из SESSION_ENGINES.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20)
+
+    def handle(self, *args, **options):
+        urls = [reverse('blog:index'), reverse('pages:about')]
+        for storage, engine in settings.SESSION_ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                for state in ('без cookie', 'устаревшая cookie', 'сессия'):
+                    total, session = self.measure(
+                        state, urls, options['requests']
+                    )
+                    self.stdout.write(
+                        f'{storage}, {state}: {total:.2f} SQL-запросов '
+                        f'на запрос, из них к сессиям {session:.2f}'
+                    )
+
+    def make_client(self, state):
+        client = Client(HTTP_HOST='localhost')
+        if state == 'устаревшая cookie':
+            client.cookies[settings.SESSION_COOKIE_NAME] = STALE_SESSION_KEY
+        elif state == 'сессия':
+            # Анонимная сессия с данными, например с непрочитанным
+            # сообщением после выхода из аккаунта.
+            store = import_module(settings.SESSION_ENGINE).SessionStore()
+            store['visited'] = True
+            store.save()
+            client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+        return client
+
+    def measure(self, state, urls, count):
+        client = self.make_client(state)
+        total = session = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal total, session
+            total += 1
+            if 'django_session' in sql:
+                session += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            for _ in range(count):
+                for url in urls:
+                    client.get(url)
+        requests = count * len(urls)
+        return total / requests, session / requests
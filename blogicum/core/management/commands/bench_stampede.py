@@ -0,0 +1,86 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Имитирует наплыв одновременных запросов к странице поста '
+        'с пустым кешем и сравнивает число SQL-запросов '
+        'с объединением промахов и без него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--post-id', type=int)
+
+    def handle(self, *args, **options):
+        post_id = options['post_id']
+        if post_id is None:
+            post = Post.objects.published().first()
+            if post is None:
+                raise CommandError(
+                    'Нет опубликованных постов: загрузите данные '
+                    'или укажите --post-id.'
+                )
+            post_id = post.id
+        url = reverse('blog:post_detail', args=[post_id])
+        for single_flight in (False, True):
+            with override_settings(
+                PAGE_CACHE_TIMEOUT=60,
+                PAGE_CACHE_SINGLE_FLIGHT=single_flight,
+            ):
+                queries, elapsed = self.run_rounds(
+                    url, options['threads'], options['rounds']
+                )
+            label = 'с single-flight' if single_flight else 'без single-flight'
+            self.stdout.write(
+                f'{label}: {queries / options["rounds"]:.1f} SQL-запросов '
+                f'на раунд, {elapsed / options["rounds"] * 1000:.1f} мс '
+                f'на раунд из {options["threads"]} запросов'
+            )
+
+    def run_rounds(self, url, threads, rounds):
+        total_queries = 0
+        total_elapsed = 0
+        for _ in range(rounds):
+            cache.clear()
+            barrier = threading.Barrier(threads)
+            counts = []
+            lock = threading.Lock()
+
+            def hit():
+                query_count = 0
+
+                def count(execute, sql, params, many, context):
+                    nonlocal query_count
+                    query_count += 1
+                    return execute(sql, params, many, context)
+
+                client = Client(HTTP_HOST='localhost')
+                barrier.wait()
+                try:
+                    with connection.execute_wrapper(count):
+                        client.get(url)
+                finally:
+                    connection.close()
+                with lock:
+                    counts.append(query_count)
+
+            workers = [threading.Thread(target=hit) for _ in range(threads)]
+            started = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            total_elapsed += time.perf_counter() - started
+            total_queries += sum(counts)
+        return total_queries, total_elapsed
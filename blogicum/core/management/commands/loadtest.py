@@ -0,0 +1,99 @@
+import json
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core import loadtest
+
+# Метрики, по которым сравниваются два прогона.
+COMPARED = ('p50_ms', 'p95_ms', 'requests_per_second', 'queries_per_request')
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет взвешенные сценарии из модулей loadtest.py приложений '
+        'внутри процесса и выводит задержки, запросы в секунду и число '
+        'SQL-запросов по именам маршрутов. Сценарии пишут в базу: '
+        'запускайте на копии, заполненной seed_load.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--seed', type=int)
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Запустить только этот сценарий; можно повторять.',
+        )
+        parser.add_argument('--output', '-o', help='Сохранить JSON сюда.')
+        parser.add_argument(
+            '--compare', help='JSON предыдущего прогона для сравнения.',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('loadtest')
+        try:
+            summary = loadtest.run(
+                options['iterations'], options['concurrency'],
+                options['seed'], options['scenarios'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        result = {
+            'commit': git_commit(),
+            'started_at': timezone.now().isoformat(),
+            'iterations': options['iterations'],
+            'concurrency': options['concurrency'],
+            'seed': options['seed'],
+            **summary,
+        }
+        self.report(result)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as fp:
+                self.compare(json.load(fp), result)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as fp:
+                json.dump(result, fp, ensure_ascii=False, indent=2)
+
+    def report(self, result):
+        self.stdout.write(
+            f'{result["requests"]} запросов за '
+            f'{result["elapsed_seconds"]:.1f} с'
+        )
+        for view_name, stats in result['urls'].items():
+            self.stdout.write(
+                f'{view_name}: {stats["requests"]} запр., '
+                f'p50 {stats["p50_ms"]:.1f} мс, '
+                f'p95 {stats["p95_ms"]:.1f} мс, '
+                f'p99 {stats["p99_ms"]:.1f} мс, '
+                f'{stats["requests_per_second"]:.1f} запр./с, '
+                f'{stats["queries_per_request"]:.1f} SQL/запр., '
+                f'ошибок {stats["errors"]}'
+            )
+
+    def compare(self, before, after):
+        self.stdout.write(
+            f'Сравнение с {before.get("commit") or "предыдущим прогоном"}:'
+        )
+        for view_name, stats in after['urls'].items():
+            old = before['urls'].get(view_name)
+            if old is None:
+                continue
+            changes = ', '.join(
+                f'{metric} {old[metric]:.1f} -> {stats[metric]:.1f}'
+                for metric in COMPARED
+            )
+            self.stdout.write(f'{view_name}: {changes}')
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.sampling import FOLDED_SUFFIX, hottest, read_stacks
+
+
+class Command(BaseCommand):
+    help = (
+        'Объединяет свёрнутые стеки выборочного профилировщика '
+        'и показывает самые горячие функции каждого представления.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', type=Path,
+            help='Каталог профилей; по умолчанию PROFILING_DIR.',
+        )
+        parser.add_argument(
+            '--view', action='append', default=[],
+            help='Имя представления, например blog:index.',
+        )
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument(
+            '--merge', type=Path,
+            help='Каталог для объединённых файлов по представлениям.',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or Path(settings.PROFILING_DIR)
+        if not directory.is_dir():
+            raise CommandError(f'Каталог {directory} не найден.')
+        views = read_stacks(directory)
+        wanted = {view.replace(':', '.') for view in options['view']}
+        if wanted:
+            views = {
+                view: stacks for view, stacks in views.items()
+                if view in wanted
+            }
+        if not views:
+            raise CommandError('Профилей не найдено.')
+        for view, stacks in sorted(
+            views.items(), key=lambda item: -sum(item[1].values())
+        ):
+            self.report(view, stacks, options['top'])
+            if options['merge']:
+                self.merge(options['merge'], view, stacks)
+
+    def report(self, view, stacks, top):
+        samples = sum(stacks.values())
+        self.stdout.write(f'\n{view}: {samples} выборок')
+        self.stdout.write(f'{"своё":>7} {"всего":>7}  функция')
+        for frame, own, total in hottest(stacks, top):
+            self.stdout.write(
+                f'{own / samples:7.1%} {total / samples:7.1%}  {frame}'
+            )
+
+    def merge(self, directory, view, stacks):
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{view}{FOLDED_SUFFIX}'
+        with open(path, 'w', encoding='utf-8') as fp:
+            for stack, count in stacks.most_common():
+                fp.write(f'{stack} {count}\n')
+        self.stdout.write(f'Сохранено: {path}')
@@ -0,0 +1,109 @@
+import gzip
+from pathlib import Path
+
+from django import forms
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.template import Context, Template
+from django.utils.module_loading import import_string
+
+from core.css import UsedSelectors, purge_css
+
+FORM_TEMPLATE = Template(
+    '{% load django_bootstrap5 %}'
+    '{% bootstrap_form form %}'
+    '{% bootstrap_button button_type="submit" content="submit" %}'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из bootstrap.min.css правила, не используемые в шаблонах, '
+        'и собирает критический CSS для base.html.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать экономию, не записывая файлы.',
+        )
+
+    def handle(self, *args, **options):
+        source_path = finders.find(settings.BOOTSTRAP_CSS)
+        if source_path is None:
+            raise CommandError(
+                f'Файл {settings.BOOTSTRAP_CSS} не найден в статике.'
+            )
+        source = Path(source_path).read_text(encoding='utf-8')
+
+        used = self.collect_used_selectors(self.template_files())
+        for html in self.render_forms():
+            used.update_from_html(html)
+        purged = purge_css(source, used)
+
+        critical_used = self.collect_used_selectors(
+            self.template_files(settings.CRITICAL_CSS_TEMPLATES)
+        )
+        # Критический CSS встраивается в <style>, где @charset не действует.
+        critical = purge_css(source, critical_used).replace(
+            '@charset "UTF-8";', '', 1
+        )
+
+        self.report('Исходный', source)
+        self.report('Очищенный', purged, source)
+        self.report('Критический', critical, source)
+        if options['dry_run']:
+            return
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        for name, content in (
+            (settings.PURGED_CSS, purged),
+            (settings.CRITICAL_CSS, critical),
+        ):
+            path = static_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding='utf-8')
+            self.stdout.write(f'Записан {path}')
+
+    def template_files(self, names=None):
+        for directory in settings.TEMPLATES[0]['DIRS']:
+            directory = Path(directory)
+            if names is None:
+                yield from sorted(directory.rglob('*.html'))
+            else:
+                yield from (
+                    directory / name for name in names
+                    if (directory / name).is_file()
+                )
+
+    def collect_used_selectors(self, paths):
+        used = UsedSelectors(
+            classes=settings.CSS_PURGE_SAFELIST,
+            tags=('html', 'body'),
+        )
+        for path in paths:
+            used.update_from_html(path.read_text(encoding='utf-8'))
+        return used
+
+    def render_forms(self):
+        """Разметка django_bootstrap5 для чистых и невалидных форм."""
+        for form_path in settings.CSS_PURGE_FORMS:
+            form_class = import_string(form_path)
+            for data in (None, {}):
+                form = form_class(data=data)
+                for field in form.fields.values():
+                    # Варианты выбора не влияют на классы, а база
+                    # на этапе сборки может быть недоступна.
+                    if isinstance(field, forms.ModelChoiceField):
+                        field.queryset = field.queryset.none()
+                yield FORM_TEMPLATE.render(Context({'form': form}))
+
+    def report(self, label, content, source=None):
+        size = len(content.encode('utf-8'))
+        gzipped = len(gzip.compress(content.encode('utf-8')))
+        line = f'{label}: {size} байт (gzip {gzipped} байт)'
+        if source is not None:
+            saved = len(source.encode('utf-8')) - size
+            percent = saved / len(source.encode('utf-8')) * 100
+            line += f', экономия {saved} байт ({percent:.1f}%)'
+        self.stdout.write(line)
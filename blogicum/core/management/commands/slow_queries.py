@@ -0,0 +1,81 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slowqueries import read_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов: отпечатки SQL с наибольшим '
+        'суммарным временем, их представления и планы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', type=Path,
+            help='Файл журнала; по умолчанию SLOW_QUERY_LOG.',
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--view', help='Только запросы этого представления.',
+        )
+        parser.add_argument(
+            '--since', help='Только записи не раньше даты YYYY-MM-DD.',
+        )
+
+    def handle(self, *args, **options):
+        path = options['log'] or Path(settings.SLOW_QUERY_LOG)
+        if not path.exists():
+            raise CommandError(f'Журнал {path} не найден.')
+        groups = self.aggregate(
+            record for record in read_records(path)
+            if (not options['view'] or record['view'] == options['view'])
+            and (not options['since'] or record['time'] >= options['since'])
+        )
+        if not groups:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        ranked = sorted(groups.values(), key=lambda group: -group['total'])
+        for number, group in enumerate(ranked[:options['top']], 1):
+            self.report(number, group)
+
+    def aggregate(self, records):
+        groups = {}
+        for record in records:
+            group = groups.setdefault(record['fingerprint'], {
+                'fingerprint': record['fingerprint'],
+                'sql': record['sql'],
+                'count': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'views': {},
+                'plan': record['plan'],
+            })
+            group['count'] += 1
+            group['total'] += record['duration_ms']
+            group['max'] = max(group['max'], record['duration_ms'])
+            group['views'][record['view']] = (
+                group['views'].get(record['view'], 0) + 1
+            )
+            # Показывается план самого свежего запроса.
+            group['plan'] = record['plan'] or group['plan']
+        return groups
+
+    def report(self, number, group):
+        views = ', '.join(
+            f'{view} ×{count}' for view, count in sorted(
+                group['views'].items(), key=lambda item: -item[1]
+            )
+        )
+        self.stdout.write(
+            f'\n{number}. {group["fingerprint"]}: {group["count"]} раз, '
+            f'всего {group["total"]:.1f} мс, '
+            f'в среднем {group["total"] / group["count"]:.1f} мс, '
+            f'максимум {group["max"]:.1f} мс'
+        )
+        self.stdout.write(f'   Представления: {views}')
+        self.stdout.write(f'   {group["sql"]}')
+        for line in group['plan']:
+            self.stdout.write(f'   | {line}')
@@ -0,0 +1,43 @@
+import logging
+
+from django.conf import settings
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+
+logger = logging.getLogger(__name__)
+
+
+class SignedCookieStorage(CookieStorage):
+    """Хранит сообщения только в подписанной cookie.
+
+    В отличие от FallbackStorage никогда не переносит сообщения в сессию:
+    длинные тексты обрезаются, а при переполнении cookie отбрасываются
+    самые старые сообщения.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_cookie_size = settings.MESSAGE_COOKIE_MAX_SIZE
+
+    def _truncate(self, message):
+        limit = settings.MESSAGE_MAX_LENGTH
+        if len(message.message) <= limit:
+            return message
+        return Message(
+            message.level,
+            message.message[:limit - 1] + '…',
+            extra_tags=message.extra_tags,
+        )
+
+    def _store(self, messages, response, remove_oldest=True, *args,
+               **kwargs):
+        messages = [self._truncate(message) for message in messages]
+        unstored = super()._store(
+            messages, response, remove_oldest, *args, **kwargs
+        )
+        if unstored:
+            logger.info(
+                'Не поместились в cookie и отброшены сообщения: %d',
+                len(unstored),
+            )
+        return []
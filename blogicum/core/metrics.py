@@ -0,0 +1,467 @@
+"""Метрики в текстовом формате Prometheus.
+
+Каждый процесс хранит значения в своих файлах METRICS_DIR/<pid>.db
+(счётчики и гистограммы) и <pid>.gauges.db (датчики), отображённых
+в память; `/metrics` складывает файлы всех процессов. Без METRICS_DIR
+значения живут в памяти процесса, что подходит для runserver и тестов.
+Счётчики суммируются по всем файлам, в том числе завершившихся
+процессов: процесс с тем же pid продолжает их файл, и сумма не меняется.
+Датчики учитываются только у живых процессов; их файл создаётся заново
+при старте и удаляется при выходе.
+"""
+import atexit
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .sampling import UNRESOLVED
+from .timing import TimedFileBasedCache, TimedTwoTierCache
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+UPLOAD_BUCKETS = tuple(1024 * 4 ** power for power in range(8))
+
+INITIAL_SIZE = 64 * 1024
+
+# Заголовок файла — занятый объём; запись — длина ключа, ключ,
+# выравнивание до 8 байт и значение double.
+_HEADER = struct.Struct('<I4x')
+_KEY_LENGTH = struct.Struct('<I')
+_VALUE = struct.Struct('<d')
+
+_MISSING = object()
+
+
+def _key_size(length):
+    return (_KEY_LENGTH.size + length + 7) // 8 * 8
+
+
+def read_entries(data):
+    """(ключ, смещение значения, значение) из содержимого файла метрик."""
+    used = _HEADER.unpack_from(data)[0]
+    offset = _HEADER.size
+    while offset < used:
+        length = _KEY_LENGTH.unpack_from(data, offset)[0]
+        start = offset + _KEY_LENGTH.size
+        key = bytes(data[start:start + length]).decode('utf-8')
+        offset += _key_size(length)
+        yield key, offset, _VALUE.unpack_from(data, offset)[0]
+        offset += _VALUE.size
+
+
+class LocalValues:
+    """Значения в памяти процесса."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def add(self, key, amount):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def set(self, key, value):
+        with self.lock:
+            self.values[key] = value
+
+    def items(self):
+        with self.lock:
+            return list(self.values.items())
+
+
+class MmapValues:
+    """Значения процесса в файле, который читают остальные процессы."""
+
+    def __init__(self, path, fresh=False):
+        self.lock = threading.Lock()
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if fresh:
+            # Файл с тем же pid остался от завершившегося процесса.
+            path.unlink(missing_ok=True)
+        self.file = open(path, 'a+b')
+        self.capacity = os.fstat(self.file.fileno()).st_size
+        if self.capacity < INITIAL_SIZE:
+            self.capacity = INITIAL_SIZE
+            self.file.truncate(self.capacity)
+        self.map = mmap.mmap(self.file.fileno(), self.capacity)
+        self.offsets = {
+            key: offset for key, offset, _ in read_entries(self.map)
+        }
+        self.used = max(_HEADER.unpack_from(self.map)[0], _HEADER.size)
+
+    def _offset(self, key):
+        offset = self.offsets.get(key)
+        if offset is not None:
+            return offset
+        encoded = key.encode('utf-8')
+        size = _key_size(len(encoded)) + _VALUE.size
+        if self.used + size > self.capacity:
+            while self.used + size > self.capacity:
+                self.capacity *= 2
+            self.file.truncate(self.capacity)
+            self.map.close()
+            self.map = mmap.mmap(self.file.fileno(), self.capacity)
+        _KEY_LENGTH.pack_into(self.map, self.used, len(encoded))
+        start = self.used + _KEY_LENGTH.size
+        self.map[start:start + len(encoded)] = encoded
+        offset = self.used + _key_size(len(encoded))
+        _VALUE.pack_into(self.map, offset, 0.0)
+        # Занятый объём растёт последним: читатель не увидит полузаписи.
+        self.used += size
+        _HEADER.pack_into(self.map, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+    def add(self, key, amount):
+        with self.lock:
+            offset = self._offset(key)
+            value = _VALUE.unpack_from(self.map, offset)[0]
+            _VALUE.pack_into(self.map, offset, value + amount)
+
+    def set(self, key, value):
+        with self.lock:
+            _VALUE.pack_into(self.map, self._offset(key), value)
+
+    def items(self):
+        with self.lock:
+            return [(key, value) for key, _, value in read_entries(self.map)]
+
+    def remove(self):
+        with self.lock:
+            self.map.close()
+            self.file.close()
+            self.path.unlink(missing_ok=True)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._lock = threading.Lock()
+        self._values = None
+        self._gauges = None
+        self._owner = None
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def _ensure_open(self):
+        # После fork у дочернего процесса должны быть свои файлы.
+        if self._owner != os.getpid():
+            with self._lock:
+                if self._owner != os.getpid():
+                    self._values, self._gauges = self._open()
+                    self._owner = os.getpid()
+
+    @property
+    def values(self):
+        self._ensure_open()
+        return self._values
+
+    @property
+    def gauges(self):
+        self._ensure_open()
+        return self._gauges
+
+    def _open(self):
+        if not settings.METRICS_DIR:
+            return LocalValues(), LocalValues()
+        directory = Path(settings.METRICS_DIR)
+        pid = os.getpid()
+        gauges = MmapValues(directory / f'{pid}.gauges.db', fresh=True)
+        atexit.register(self._remove_gauges, gauges, pid)
+        return MmapValues(directory / f'{pid}.db'), gauges
+
+    @staticmethod
+    def _remove_gauges(gauges, pid):
+        # Обработчики atexit наследуются при fork: чужой файл не трогаем.
+        if os.getpid() == pid:
+            gauges.remove()
+
+    def reset(self):
+        """Открывает хранилище заново; для тестов и бенчмарков."""
+        with self._lock:
+            self._owner = None
+
+    def samples(self):
+        """{ключ: значение}, сложенные по всем процессам."""
+        if not settings.METRICS_DIR:
+            return {**dict(self.values.items()), **dict(self.gauges.items())}
+        totals = {}
+        for path in Path(settings.METRICS_DIR).glob('*.db'):
+            pid, _, kind = path.stem.partition('.')
+            if kind == 'gauges' and not _alive(int(pid)):
+                continue
+            for key, _, value in read_entries(path.read_bytes()):
+                totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def exposition(self):
+        grouped = {}
+        for key, value in self.samples().items():
+            name, suffix, labels = json.loads(key)
+            grouped.setdefault(name, []).append((suffix, labels, value))
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            lines.extend(metric.lines(sorted(grouped.get(name, []))))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _format_value(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        registry.register(self)
+
+    def key(self, suffix, labels, extra=()):
+        values = tuple(labels[name] for name in self.labelnames)
+        cache_key = (suffix, values, extra)
+        key = self._keys.get(cache_key)
+        if key is None:
+            pairs = [*zip(self.labelnames, map(str, values)), *extra]
+            key = self._keys[cache_key] = json.dumps(
+                [self.name, suffix, pairs], ensure_ascii=False
+            )
+        return key
+
+    def lines(self, samples):
+        return [
+            f'{self.name}{suffix}{_format_labels(labels)} '
+            f'{_format_value(value)}'
+            for suffix, labels, value in samples
+        ]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        registry.values.add(self.key('_total', labels), amount)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        registry.gauges.add(self.key('', labels), amount)
+
+    def dec(self, amount=1, **labels):
+        registry.gauges.add(self.key('', labels), -amount)
+
+    def set(self, value, **labels):
+        registry.gauges.set(self.key('', labels), value)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.bounds = [_format_value(float(bound)) for bound in self.buckets]
+        self.bounds.append('+Inf')
+
+    def observe(self, value, **labels):
+        values = registry.values
+        bound = self.bounds[bisect.bisect_left(self.buckets, value)]
+        values.add(self.key('_bucket', labels, (('le', bound),)), 1)
+        values.add(self.key('_sum', labels), value)
+        values.add(self.key('_count', labels), 1)
+
+    def lines(self, samples):
+        # Хранятся попадания в каждый интервал, выводятся накопленные.
+        series = {}
+        for suffix, labels, value in samples:
+            if suffix == '_bucket':
+                *labels, (_, bound) = labels
+                counts = series.setdefault(_freeze(labels), {})
+                counts[bound] = counts.get(bound, 0.0) + value
+        lines = []
+        for labels, counts in sorted(series.items()):
+            total = 0.0
+            for bound in self.bounds:
+                total += counts.get(bound, 0.0)
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{_format_labels([*labels, ("le", bound)])} '
+                    f'{_format_value(total)}'
+                )
+        return lines + super().lines(
+            sample for sample in samples if sample[0] != '_bucket'
+        )
+
+
+def _freeze(labels):
+    return tuple(tuple(pair) for pair in labels)
+
+
+request_latency = Histogram(
+    'blogicum_request_duration_seconds',
+    'Время обработки запроса по представлениям.',
+    ['view'], LATENCY_BUCKETS,
+)
+responses = Counter(
+    'blogicum_responses',
+    'Ответы по представлениям и кодам статуса.',
+    ['view', 'status'],
+)
+requests_in_progress = Gauge(
+    'blogicum_requests_in_progress',
+    'Запросы, которые обрабатываются прямо сейчас.',
+)
+queries_per_request = Histogram(
+    'blogicum_db_queries_per_request',
+    'Число SQL-запросов на один HTTP-запрос.',
+    ['view'], QUERY_BUCKETS,
+)
+cache_requests = Counter(
+    'blogicum_cache_requests',
+    'Чтения кеша: попадания и промахи.',
+    ['cache', 'result'],
+)
+page_cache_requests = Counter(
+    'blogicum_page_cache_requests',
+    'Обращения к кешу страниц: свежие и устаревшие попадания, промахи.',
+    ['result'],
+)
+page_cache_refreshes = Counter(
+    'blogicum_page_cache_refreshes',
+    'Фоновые обновления устаревших страниц: выполненные, с ошибкой '
+    'и пропущенные.',
+    ['result'],
+)
+page_cache_refresh_duration = Histogram(
+    'blogicum_page_cache_refresh_duration_seconds',
+    'Время фонового обновления устаревшей страницы.',
+    buckets=LATENCY_BUCKETS,
+)
+upload_size = Histogram(
+    'blogicum_upload_size_bytes',
+    'Размер загруженных файлов.',
+    ['view'], UPLOAD_BUCKETS,
+)
+
+
+_cache_depth = threading.local()
+
+
+class CacheMetricsMixin:
+    """Считает попадания и промахи get() по префиксу ключей кеша.
+
+    Учитывается только внешний вызов: промах локального уровня
+    TwoTierCache, дочитанный из общего, — одно обращение, а не два.
+    """
+
+    def get(self, key, default=None, version=None):
+        depth = getattr(_cache_depth, 'value', 0)
+        _cache_depth.value = depth + 1
+        try:
+            value = super().get(key, _MISSING, version)
+        finally:
+            _cache_depth.value = depth
+        if settings.METRICS_ENABLED and not depth:
+            cache_requests.inc(
+                cache=self.key_prefix or 'default',
+                result='miss' if value is _MISSING else 'hit',
+            )
+        return default if value is _MISSING else value
+
+
+class MeteredFileBasedCache(CacheMetricsMixin, TimedFileBasedCache):
+    pass
+
+
+class MeteredTwoTierCache(CacheMetricsMixin, TimedTwoTierCache):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        requests_in_progress.inc()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(queries))
+                response = self.get_response(request)
+        finally:
+            requests_in_progress.dec()
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNRESOLVED
+        request_latency.observe(time.perf_counter() - started, view=view)
+        responses.inc(view=view, status=response.status_code)
+        queries_per_request.observe(queries.count, view=view)
+        # Файлы считаются, только если представление уже разобрало форму.
+        if '_files' in request.__dict__:
+            for files in request.FILES.lists():
+                for upload in files[1]:
+                    upload_size.observe(upload.size, view=view)
+        return response
@@ -0,0 +1,175 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date
+
+from .compression import (
+    COMPRESSED_CONTENT_TYPES, MIN_COMPRESS_SIZE, accepted_encodings,
+    brotli_compress, has_brotli,
+)
+
+# Содержимое этих тегов выводится как есть, пробелы в нём значимы.
+PRESERVED_BLOCK_RE = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)',
+    re.IGNORECASE | re.DOTALL,
+)
+# Тег целиком, включая значения атрибутов в кавычках, в которых
+# может встретиться `>`.
+TAG_RE = re.compile(r'''(<(?:[^>"']|"[^"]*"|'[^']*')*>)''')
+ATTRIBUTE_VALUE_RE = re.compile(r'''("[^"]*"|'[^']*')''')
+NEWLINE_WHITESPACE_RE = re.compile(r'[ \t\r\f\v]*\n\s*')
+INLINE_WHITESPACE_RE = re.compile(r'[ \t\r\f\v]{2,}')
+TAG_WHITESPACE_RE = re.compile(r'\s+')
+
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+STATIC_UNHASHED_MAX_AGE = 60
+
+
+def _minify_tag(tag):
+    # Значения атрибутов (нечётные части) выводятся браузером как есть.
+    parts = ATTRIBUTE_VALUE_RE.split(tag)
+    parts[::2] = [TAG_WHITESPACE_RE.sub(' ', part) for part in parts[::2]]
+    return ''.join(parts)
+
+
+def _minify_markup(markup):
+    parts = TAG_RE.split(markup)
+    for index, part in enumerate(parts):
+        if index % 2:
+            parts[index] = _minify_tag(part)
+        else:
+            parts[index] = INLINE_WHITESPACE_RE.sub(
+                ' ', NEWLINE_WHITESPACE_RE.sub('\n', part)
+            )
+    return ''.join(parts)
+
+
+def minify_html(html):
+    """Схлопывает пробелы так же, как это сделал бы браузер при отрисовке."""
+    parts = PRESERVED_BLOCK_RE.split(html)
+    result = []
+    # split с двумя группами возвращает [текст, блок, имя_тега, текст, ...].
+    for index in range(0, len(parts), 3):
+        result.append(_minify_markup(parts[index]))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result).strip()
+
+
+class HTMLMinifyMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if (
+            not getattr(settings, 'HTML_MINIFY', True)
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+        charset = response.charset
+        content = response.content.decode(charset)
+        response.content = minify_html(content).encode(charset)
+        if response.has_header('Content-Length'):
+            response.headers['Content-Length'] = str(len(response.content))
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Brotli, если клиент и окружение его поддерживают, иначе gzip."""
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith(
+            COMPRESSED_CONTENT_TYPES
+        ):
+            return response
+        if (
+            response.streaming
+            or not has_brotli()
+            or 'br' not in accepted_encodings(request)
+            or response.has_header('Content-Encoding')
+            or len(response.content) < MIN_COMPRESS_SIZE
+        ):
+            return super().process_response(request, response)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed_content = brotli_compress(response.content)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers['Content-Length'] = str(len(response.content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+class PrecompressedStaticMiddleware:
+    """Отдаёт собранную статику с .br/.gz-копиями и долгим кешированием.
+
+    Имена с хешем содержимого неизменяемы, поэтому кешируются на год.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.static_root = getattr(settings, 'STATIC_ROOT', None)
+        self._hashed_names = None
+
+    def __call__(self, request):
+        if (
+            self.static_root
+            and request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(settings.STATIC_URL)
+        ):
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request):
+        name = request.path_info[len(settings.STATIC_URL):]
+        path = os.path.normpath(os.path.join(self.static_root, name))
+        if (
+            not path.startswith(os.path.normpath(self.static_root) + os.sep)
+            or not os.path.isfile(path)
+        ):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        encodings = accepted_encodings(request)
+        served_path, encoding = path, None
+        for candidate, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if candidate in encodings and os.path.isfile(path + suffix):
+                served_path, encoding = path + suffix, candidate
+                break
+        response = FileResponse(
+            open(served_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        patch_vary_headers(response, ('Accept-Encoding',))
+        max_age = (
+            STATIC_MAX_AGE if self.is_hashed(name)
+            else STATIC_UNHASHED_MAX_AGE
+        )
+        response.headers['Cache-Control'] = (
+            f'public, max-age={max_age}'
+            + (', immutable' if max_age == STATIC_MAX_AGE else '')
+        )
+        response.headers['Last-Modified'] = http_date(
+            os.path.getmtime(served_path)
+        )
+        return response
+
+    def is_hashed(self, name):
+        # Манифест меняется только collectstatic с перезапуском сервера.
+        if self._hashed_names is None:
+            self._hashed_names = frozenset(
+                getattr(staticfiles_storage, 'hashed_files', {}).values()
+            )
+        return name in self._hashed_names
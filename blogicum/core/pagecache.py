@@ -0,0 +1,293 @@
+import copy
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .generations import versioned_key
+from .holes import fill_holes
+from .singleflight import SingleFlight
+
+PAGE_CACHE_PREFIX = 'page'
+
+logger = logging.getLogger(__name__)
+
+page_flight = SingleFlight(lock_timeout=settings.PAGE_CACHE_LOCK_TIMEOUT)
+
+
+# Счётчик PageCacheStats -> метрика Prometheus и значение метки result.
+STATS_METRICS = {
+    'fresh_hits': (metrics.page_cache_requests, 'fresh_hit'),
+    'stale_hits': (metrics.page_cache_requests, 'stale_hit'),
+    'misses': (metrics.page_cache_requests, 'miss'),
+    'refresh_errors': (metrics.page_cache_refreshes, 'error'),
+    'refreshes_skipped': (metrics.page_cache_refreshes, 'skipped'),
+}
+
+
+class PageCacheStats:
+    """Счётчики кеша страниц текущего процесса.
+
+    Те же события попадают в метрики blogicum_page_cache_* на /metrics,
+    где складываются по всем процессам.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                'fresh_hits': 0,
+                'stale_hits': 0,
+                'misses': 0,
+                'refreshes': 0,
+                'refresh_errors': 0,
+                'refreshes_skipped': 0,
+            }
+            self.refresh_seconds_total = 0.0
+            self.refresh_seconds_max = 0.0
+
+    def incr(self, name):
+        with self._lock:
+            self.counters[name] += 1
+        if settings.METRICS_ENABLED:
+            metric, result = STATS_METRICS[name]
+            metric.inc(result=result)
+
+    def observe_refresh(self, seconds):
+        with self._lock:
+            self.counters['refreshes'] += 1
+            self.refresh_seconds_total += seconds
+            self.refresh_seconds_max = max(self.refresh_seconds_max, seconds)
+        if settings.METRICS_ENABLED:
+            metrics.page_cache_refreshes.inc(result='done')
+            metrics.page_cache_refresh_duration.observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.counters,
+                'refresh_seconds_total': self.refresh_seconds_total,
+                'refresh_seconds_max': self.refresh_seconds_max,
+            }
+
+
+stats = PageCacheStats()
+
+
+class BackgroundRefresher:
+    """Ограниченный пул потоков для перестроения устаревших страниц."""
+
+    def __init__(self, max_workers, max_pending):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='page-refresh'
+        )
+        self._lock = threading.Lock()
+        self._pending = set()
+
+    def submit(self, key, refresh):
+        with self._lock:
+            if key in self._pending or len(self._pending) >= self.max_pending:
+                stats.incr('refreshes_skipped')
+                return None
+            self._pending.add(key)
+        return self._executor.submit(self._run, key, refresh)
+
+    def _run(self, key, refresh):
+        lock_key = f'refresh:{key}'
+        # Ключ в общем кеше не даёт другим процессам обновлять ту же страницу.
+        if not cache.add(lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT):
+            stats.incr('refreshes_skipped')
+            self._done(key)
+            return
+        started = time.perf_counter()
+        try:
+            refresh()
+        except Exception:
+            stats.incr('refresh_errors')
+            logger.exception('Не удалось обновить страницу %s', key)
+        else:
+            duration = time.perf_counter() - started
+            stats.observe_refresh(duration)
+            logger.debug('Страница %s обновлена за %.3f с', key, duration)
+        finally:
+            cache.delete(lock_key)
+            close_old_connections()
+            self._done(key)
+
+    def _done(self, key):
+        with self._lock:
+            self._pending.discard(key)
+
+
+refresher = BackgroundRefresher(
+    max_workers=settings.PAGE_CACHE_REFRESH_WORKERS,
+    max_pending=settings.PAGE_CACHE_REFRESH_QUEUE,
+)
+
+
+def page_cache_key(request, namespaces=()):
+    """Ключ страницы; смена поколения любого из namespaces меняет ключ."""
+    key = versioned_key(
+        PAGE_CACHE_PREFIX, namespaces, request.get_full_path()
+    )
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+    return f'{PAGE_CACHE_PREFIX}:{digest}'
+
+
+def mark_private(request):
+    """Ответ на этот запрос нельзя класть в общий кеш."""
+    request.page_cache_private = True
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not getattr(request, 'page_cache_private', False)
+    )
+
+
+class CachedPage:
+    def __init__(self, view, stale_while_revalidate, depends_on):
+        self.view = view
+        self.stale_while_revalidate = stale_while_revalidate
+        self.depends_on = depends_on
+
+    def __call__(self, request, *args, **kwargs):
+        if (
+            not settings.PAGE_CACHE_TIMEOUT
+            or request.method not in ('GET', 'HEAD')
+        ):
+            return self.view(request, *args, **kwargs)
+        namespaces = (
+            self.depends_on(request, *args, **kwargs)
+            if self.depends_on else ()
+        )
+        key = page_cache_key(request, namespaces)
+        cached = cache.get(key)
+        if cached is None:
+            stats.incr('misses')
+            return self.build(key, request, args, kwargs)
+        if cached[2] <= time.time():
+            stats.incr('stale_hits')
+            refresher.submit(
+                key, lambda: self.refresh(key, request, args, kwargs)
+            )
+        else:
+            stats.incr('fresh_hits')
+        return self.respond(request, cached)
+
+    def build(self, key, request, args, kwargs):
+        own = {}
+
+        def build():
+            response = own['response'] = render_shared(
+                self.view, request, *args, **kwargs
+            )
+            return self.store(key, request, response)
+
+        if settings.PAGE_CACHE_SINGLE_FLIGHT:
+            cached = page_flight.do(
+                key, build, recheck=lambda: cache.get(key)
+            )
+        else:
+            cached = build()
+        if 'response' in own:
+            return render_private(request, own['response'])
+        if cached is None:
+            # Ведущий запрос оказался приватным: строим страницу сами.
+            return render_private(
+                request, render_shared(self.view, request, *args, **kwargs)
+            )
+        return self.respond(request, cached)
+
+    def store(self, key, request, response):
+        if not is_cacheable(request, response):
+            return None
+        soft_timeout = settings.PAGE_CACHE_TIMEOUT
+        hard_timeout = soft_timeout
+        if self.stale_while_revalidate:
+            hard_timeout += settings.PAGE_CACHE_STALE_TIMEOUT
+        entry = (
+            response.content,
+            response['Content-Type'],
+            time.time() + soft_timeout,
+        )
+        cache.set(key, entry, hard_timeout)
+        return entry
+
+    def refresh(self, key, request, args, kwargs):
+        # Общая копия не должна зависеть от того, кто её запросил.
+        shared_request = copy.copy(request)
+        shared_request.user = AnonymousUser()
+        self.store(key, shared_request, render_shared(
+            self.view, shared_request, *args, **kwargs
+        ))
+
+    @staticmethod
+    def respond(request, cached):
+        content, content_type, _ = cached
+        return render_private(
+            request, HttpResponse(content, content_type=content_type)
+        )
+
+
+def cache_page_with_holes(
+    view=None, *, stale_while_revalidate=False, depends_on=None
+):
+    """Кеширует страницу одной копией для всех пользователей.
+
+    Персональные фрагменты, отмеченные тегом `{% hole %}`, хранятся
+    в кеше маркерами и дорисовываются для каждого запроса отдельно.
+    С `stale_while_revalidate` по истечении PAGE_CACHE_TIMEOUT страница
+    ещё PAGE_CACHE_STALE_TIMEOUT отдаётся из кеша, а свежая версия
+    строится в фоне. `depends_on(request, *args, **kwargs)` возвращает
+    пространства имён поколений, от которых зависит страница.
+    """
+    if view is None:
+        return lambda view: cache_page_with_holes(
+            view,
+            stale_while_revalidate=stale_while_revalidate,
+            depends_on=depends_on,
+        )
+    page = CachedPage(view, stale_while_revalidate, depends_on)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return page(request, *args, **kwargs)
+    return wrapper
+
+
+def render_shared(view, request, *args, **kwargs):
+    request.punch_holes = True
+    try:
+        return view(request, *args, **kwargs)
+    finally:
+        request.punch_holes = False
+
+
+def render_private(request, response):
+    if response.streaming or not response.get(
+        'Content-Type', ''
+    ).startswith('text/html'):
+        return response
+    response.content = fill_holes(
+        response.content.decode(response.charset), request
+    ).encode(response.charset)
+    patch_vary_headers(response, ('Cookie',))
+    return response
@@ -0,0 +1,121 @@
+"""Профили middleware для отдельных маршрутов.
+
+Лёгкие маршруты (статические страницы, медиафайлы, ленты) не нуждаются
+в части middleware: сессиях, CSRF, сообщениях. Профиль маршрута задаётся
+в настройках по имени URL или префиксу пути, а обёртки над стандартными
+middleware пропускают свою работу, если она исключена профилем.
+"""
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import ImproperlyConfigured
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.urls import Resolver404, get_urlconf, resolve
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# Без сессии нельзя ни аутентифицировать пользователя,
+# ни хранить сообщения в ней.
+REQUIRES = {
+    'auth': 'session',
+    'messages': 'session',
+}
+
+
+@lru_cache(maxsize=4096)
+def _view_name(path, urlconf):
+    try:
+        return resolve(path, urlconf).view_name
+    except Resolver404:
+        return None
+
+
+def route_profile(path):
+    """Имя профиля для пути запроса или None."""
+    for prefix, profile in settings.MIDDLEWARE_PROFILE_PATHS.items():
+        if path.startswith(prefix):
+            return profile
+    view_name = _view_name(path, get_urlconf())
+    return settings.ROUTE_MIDDLEWARE_PROFILES.get(view_name)
+
+
+def check_profiles(profiles):
+    for name, skipped in profiles.items():
+        for middleware, required in REQUIRES.items():
+            if required in skipped and middleware not in skipped:
+                raise ImproperlyConfigured(
+                    f'Профиль middleware {name!r} отключает {required!r}, '
+                    f'но оставляет зависящий от него {middleware!r}.'
+                )
+
+
+class RouteProfileMiddleware:
+    """Определяет профиль маршрута; должен стоять перед обёртками."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        check_profiles(settings.MIDDLEWARE_PROFILES)
+
+    def __call__(self, request):
+        request.skip_middleware = frozenset()
+        if settings.MIDDLEWARE_PROFILES_ENABLED:
+            profile = route_profile(request.path_info)
+            if profile is not None:
+                request.skip_middleware = frozenset(
+                    settings.MIDDLEWARE_PROFILES[profile]
+                )
+        return self.get_response(request)
+
+
+class ProfiledMiddlewareMixin:
+    """Пропускает middleware, если его отключает профиль маршрута."""
+
+    profile_name = None
+
+    def skipped(self, request):
+        return self.profile_name in getattr(request, 'skip_middleware', ())
+
+    def __call__(self, request):
+        if self.skipped(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+    def process_view(self, request, *args, **kwargs):
+        parent = getattr(super(), 'process_view', None)
+        if parent is None or self.skipped(request):
+            return None
+        return parent(request, *args, **kwargs)
+
+
+class ProfiledSessionMiddleware(ProfiledMiddlewareMixin, SessionMiddleware):
+    profile_name = 'session'
+
+
+class ProfiledCsrfViewMiddleware(
+    ProfiledMiddlewareMixin, CsrfViewMiddleware
+):
+    profile_name = 'csrf'
+
+    def skipped(self, request):
+        # Изменяющие запросы проверяются всегда, какой бы ни был профиль.
+        return request.method in SAFE_METHODS and super().skipped(request)
+
+
+class ProfiledAuthenticationMiddleware(
+    ProfiledMiddlewareMixin, AuthenticationMiddleware
+):
+    profile_name = 'auth'
+
+
+class ProfiledMessageMiddleware(ProfiledMiddlewareMixin, MessageMiddleware):
+    profile_name = 'messages'
+
+
+class ProfiledXFrameOptionsMiddleware(
+    ProfiledMiddlewareMixin, XFrameOptionsMiddleware
+):
+    profile_name = 'clickjacking'
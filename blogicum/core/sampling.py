@@ -0,0 +1,172 @@
+"""Выборочное профилирование запросов с выводом свёрнутых стеков.
+
+Для доли запросов PROFILING_SAMPLE_RATE фоновый поток снимает стек
+потока запроса раз в PROFILING_INTERVAL секунд. Стеки копятся по имени
+представления в файлах `<представление>.<pid>.folded` формата
+flamegraph.pl / speedscope: «кадр;кадр;...;кадр число». Объединяет файлы
+и показывает самые горячие функции `manage.py profile_report`.
+"""
+import logging
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+FOLDED_SUFFIX = '.folded'
+
+# Запросы, которые не сопоставились ни с одним представлением.
+UNRESOLVED = 'unresolved'
+
+_write_lock = threading.Lock()
+
+
+def _search_paths():
+    return sorted(
+        (str(Path(path).resolve()) for path in sys.path if path),
+        key=len, reverse=True,
+    )
+
+
+class FrameLabels:
+    """Подписи кадров вида `функция (модуль/файл.py:строка)`."""
+
+    def __init__(self):
+        self.paths = _search_paths()
+        self.labels = {}
+
+    def __call__(self, code):
+        label = self.labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for path in self.paths:
+                if filename.startswith(path + os.sep):
+                    filename = filename[len(path) + 1:]
+                    break
+            label = f'{code.co_name} ({filename}:{code.co_firstlineno})'
+            label = label.replace(';', ',')
+            self.labels[code] = label
+        return label
+
+
+frame_label = FrameLabels()
+
+
+def collapse(frame, root=None):
+    """Стек от корня до frame; кадры выше root не попадают в результат."""
+    labels = []
+    while frame is not None and frame is not root:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    if frame is root and root is not None:
+        labels.append(frame_label(root.f_code))
+    return ';'.join(reversed(labels))
+
+
+class StackSampler(threading.Thread):
+    """Снимает стек одного потока, пока не будет вызван stop()."""
+
+    def __init__(self, thread_id, root, interval):
+        super().__init__(daemon=True, name='stack-sampler')
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            # После stop() поток запроса лишь ждёт завершения выборки.
+            if frame is not None and not self._stopped.is_set():
+                self.stacks[collapse(frame, self.root)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+
+def view_file_name(view_name):
+    return (view_name or UNRESOLVED).replace(':', '.')
+
+
+def write_stacks(view_name, stacks, directory=None):
+    directory = Path(directory or settings.PROFILING_DIR)
+    path = directory / (
+        f'{view_file_name(view_name)}.{os.getpid()}{FOLDED_SUFFIX}'
+    )
+    lines = ''.join(
+        f'{stack} {count}\n' for stack, count in stacks.items()
+    )
+    with _write_lock:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as fp:
+            fp.write(lines)
+    return path
+
+
+def read_stacks(directory):
+    """Суммирует стеки всех процессов: {представление: Counter}."""
+    views = {}
+    for path in sorted(Path(directory).glob(f'*{FOLDED_SUFFIX}')):
+        view, _, _ = path.name[:-len(FOLDED_SUFFIX)].rpartition('.')
+        stacks = views.setdefault(view, Counter())
+        with open(path, encoding='utf-8') as fp:
+            for line in fp:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return views
+
+
+def hottest(stacks, limit):
+    """Функции с наибольшим собственным и полным числом выборок."""
+    own = Counter()
+    total = Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return [
+        (frame, count, total[frame])
+        for frame, count in own.most_common(limit)
+    ]
+
+
+class SamplingProfilerMiddleware:
+    """Профилирует случайную долю запросов; ставится первым в MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        sampler = StackSampler(
+            threading.get_ident(), sys._getframe(),
+            settings.PROFILING_INTERVAL,
+        )
+        sampler.start()
+        try:
+            return self.get_response(request)
+        finally:
+            stacks = sampler.stop()
+            if stacks:
+                self.save(request, stacks)
+
+    def save(self, request, stacks):
+        match = getattr(request, 'resolver_match', None)
+        try:
+            write_stacks(match.view_name if match else None, stacks)
+        except OSError:
+            logger.exception('Не удалось сохранить профиль запроса')
@@ -0,0 +1,84 @@
+import threading
+import time
+import uuid
+
+from django.core.cache import cache as default_cache
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    """Схлопывает одновременные вычисления одного и того же значения.
+
+    Внутри процесса ожидающие потоки получают результат первого потока.
+    Между процессами ведущий определяется блокировкой через `cache.add`,
+    остальные опрашивают кеш, пока она держится. Защита держится, только
+    если add бэкенда атомарен: у стандартного FileBasedCache это не так,
+    поэтому в проекте используется core.cache.AtomicFileBasedCache.
+    """
+
+    def __init__(self, cache=None, lock_timeout=10, poll_interval=0.05):
+        self.cache = cache or default_cache
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def do(self, key, compute, recheck=None, stale=None):
+        """Возвращает результат `compute()`, вычисленный один раз на ключ.
+
+        `recheck` достаёт готовое значение из кеша, пока ждём другой
+        процесс; если передан `stale`, ожидающие сразу получают его.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = self._flights[key] = _Flight()
+        if not is_leader:
+            if stale is not None:
+                return stale
+            if flight.done.wait(self.lock_timeout) and not flight.failed:
+                return flight.result
+            return compute()
+        try:
+            flight.result = self._do_locked(key, compute, recheck, stale)
+            return flight.result
+        except BaseException:
+            flight.failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _do_locked(self, key, compute, recheck, stale):
+        lock_key = f'lock:{key}'
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        acquired = self.cache.add(lock_key, token, self.lock_timeout)
+        while not acquired:
+            if stale is not None:
+                return stale
+            value = recheck() if recheck else None
+            if value is not None:
+                return value
+            if time.monotonic() >= deadline:
+                # Владелец блокировки завис или упал — считаем сами.
+                break
+            time.sleep(self.poll_interval)
+            acquired = self.cache.add(lock_key, token, self.lock_timeout)
+        try:
+            if acquired and recheck:
+                value = recheck()
+                if value is not None:
+                    return value
+            return compute()
+        finally:
+            if acquired and self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
@@ -0,0 +1,132 @@
+"""Журнал медленных SQL-запросов с планом выполнения.
+
+Запросы дольше SLOW_QUERY_THRESHOLD секунд попадают в журнал
+core.slowqueries и строкой JSON в SLOW_QUERY_LOG вместе с именем
+представления, отпечатком SQL и EXPLAIN QUERY PLAN (EXPLAIN на других
+СУБД). Сводку по отпечаткам строит `manage.py slow_queries`.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+
+from .sampling import UNRESOLVED
+
+logger = logging.getLogger(__name__)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%s|\?')
+IN_LIST_RE = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+WHITESPACE_RE = re.compile(r'\s+')
+
+_write_lock = threading.Lock()
+
+
+def normalize(sql):
+    """SQL без значений: литералы и параметры заменены на `?`."""
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    sql = WHITESPACE_RE.sub(' ', sql).strip()
+    return IN_LIST_RE.sub('IN (...)', sql)
+
+
+def fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode('utf-8')).hexdigest()[:12]
+
+
+def explain(connection, sql, params):
+    """План запроса отдельным курсором в обход execute_wrapper."""
+    prefix = connection.ops.explain_query_prefix()
+    cursor = connection.create_cursor()
+    try:
+        cursor.execute(f'{prefix} {sql}', params)
+        # Описание шага плана — последний столбец и в SQLite, и в EXPLAIN.
+        return [str(row[-1]) for row in cursor.fetchall()]
+    except DatabaseError:
+        logger.exception('Не удалось получить план запроса')
+        return []
+    finally:
+        cursor.close()
+
+
+def write_record(record, path=None):
+    path = Path(path or settings.SLOW_QUERY_LOG)
+    line = json.dumps(record, ensure_ascii=False) + '\n'
+    with _write_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as fp:
+            fp.write(line)
+
+
+def read_records(path):
+    with open(path, encoding='utf-8') as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+class SlowQueryRecorder:
+    def __init__(self, request, connection, threshold):
+        self.request = request
+        self.connection = connection
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started
+        if duration >= self.threshold:
+            self.record(sql, params, many, duration)
+        return result
+
+    def record(self, sql, params, many, duration):
+        match = getattr(self.request, 'resolver_match', None)
+        normalized = normalize(sql)
+        explainable = not many and normalized.upper().startswith('SELECT')
+        record = {
+            'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'database': self.connection.alias,
+            'view': match.view_name if match else UNRESOLVED,
+            'duration_ms': round(duration * 1000, 2),
+            'fingerprint': fingerprint(sql),
+            'sql': normalized,
+            'plan': (
+                explain(self.connection, sql, params) if explainable else []
+            ),
+        }
+        logger.warning(
+            'Медленный запрос %(duration_ms).1f мс в %(view)s: %(sql)s',
+            record,
+        )
+        try:
+            write_record(record)
+        except OSError:
+            logger.exception('Не удалось записать медленный запрос')
+
+
+class SlowQueryMiddleware:
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_THRESHOLD is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    SlowQueryRecorder(
+                        request, connection, settings.SLOW_QUERY_THRESHOLD
+                    )
+                ))
+            return self.get_response(request)
@@ -0,0 +1,51 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import (
+    INCOMPRESSIBLE_EXTENSIONS, MIN_COMPRESS_SIZE, brotli_compress,
+    gzip_compress, has_brotli,
+)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хеширует имена файлов и кладёт рядом .gz/.br-копии.
+
+    До запуска collectstatic отдаёт исходные имена, чтобы разработка
+    и тесты работали без собранной статики.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            for compressed_name in self.compress(hashed_name):
+                yield hashed_name, compressed_name, True
+
+    def compress(self, name):
+        if name.lower().endswith(INCOMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        compressors = [('.gz', gzip_compress)]
+        if has_brotli():
+            compressors.append(('.br', brotli_compress))
+        for suffix, compress in compressors:
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            compressed_name = name + suffix
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
+            yield compressed_name
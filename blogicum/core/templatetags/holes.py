@@ -0,0 +1,22 @@
+from django import template
+
+from core.holes import is_punching, make_marker
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **kwargs):
+    """Фрагмент, зависящий от пользователя.
+
+    При сборке страницы для общего кеша выводит маркер, который заполняется
+    отдельно для каждого запроса; в остальных случаях работает как include.
+    Аргументы должны сериализоваться в JSON.
+    """
+    request = context.get('request')
+    if request is not None and is_punching(request):
+        return make_marker(template_name, kwargs)
+    with context.push(**kwargs):
+        return context.template.engine.get_template(
+            template_name
+        ).render(context)
@@ -0,0 +1,78 @@
+from functools import wraps
+from pathlib import Path
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+def _cache_found(func):
+    """Запоминает только найденное: промах повторяется на каждом вызове.
+
+    Файлы из `purge_css` могут появиться при запущенном сервере, и
+    закешированный промах держал бы полный CSS до перезапуска.
+    """
+    found = {}
+
+    @wraps(func)
+    def wrapper(name):
+        if name not in found:
+            value = func(name)
+            if value is None:
+                return None
+            found[name] = value
+        return found[name]
+    wrapper.cache_clear = found.clear
+    return wrapper
+
+
+@_cache_found
+def _find_static(name):
+    return finders.find(name)
+
+
+@_cache_found
+def _read_static(name):
+    path = _find_static(name)
+    if path is None:
+        return None
+    return Path(path).read_text(encoding='utf-8')
+
+
+def _critical_css():
+    if not settings.USE_PURGED_CSS:
+        return None
+    return _read_static(settings.CRITICAL_CSS) or None
+
+
+@register.simple_tag
+def bootstrap_stylesheet():
+    """Очищенный bootstrap, если он собран, иначе полный файл.
+
+    При встроенном критическом CSS файл грузится без блокировки
+    отрисовки; без JavaScript его подключает `<noscript>`.
+    """
+    name = settings.BOOTSTRAP_CSS
+    if settings.USE_PURGED_CSS and _find_static(settings.PURGED_CSS):
+        name = settings.PURGED_CSS
+    if _critical_css() is None:
+        return format_html('<link rel="stylesheet" href="{}">', static(name))
+    return format_html(
+        '<link rel="preload" href="{0}" as="style" '
+        'onload="this.onload=null;this.rel=\'stylesheet\'">'
+        '<noscript><link rel="stylesheet" href="{0}"></noscript>',
+        static(name),
+    )
+
+
+@register.simple_tag
+def critical_css():
+    css = _critical_css()
+    if css is None:
+        return ''
+    return mark_safe(f'<style>{css}</style>')
@@ -0,0 +1,210 @@
+"""Разбивка времени запроса для заголовка Server-Timing и журнала.
+
+ServerTimingMiddleware ставится в начало MIDDLEWARE, а
+ServerTimingViewMiddleware — в конец: разница между ними — время
+остальных middleware. SQL считается через connection.execute_wrapper,
+шаблоны — бэкендом TimedDjangoTemplates, кеш — бэкендами Timed*Cache.
+Вложенные вызовы (шаблон внутри шаблона, общий уровень TwoTierCache)
+входят во время внешнего и отдельно не учитываются.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from .cache import AtomicFileBasedCache, TwoTierCache
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+CACHE_OPERATIONS = {
+    'get': 'get',
+    'get_many': 'get',
+    'has_key': 'get',
+    'set': 'set',
+    'add': 'set',
+    'set_many': 'set',
+    'touch': 'set',
+    'incr': 'set',
+    'delete': 'set',
+    'delete_many': 'set',
+}
+
+
+class RequestTimings:
+    """Время, накопленное одним запросом, в секундах."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.inner = 0.0
+        self.sql = 0.0
+        self.queries = 0
+        self.templates = []
+        self.cache = {'get': [0.0, 0], 'set': [0.0, 0]}
+        self.depth = {'template': 0, 'cache': 0}
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries += 1
+
+    def metrics(self, total):
+        """[(имя, секунды, описание)] в порядке вывода."""
+        metrics = [
+            ('total', total, None),
+            ('mw', total - self.inner, 'middleware'),
+            ('sql', self.sql, f'{self.queries} queries'),
+        ]
+        for kind, (seconds, count) in self.cache.items():
+            if count:
+                metrics.append((f'cache-{kind}', seconds, f'{count} calls'))
+        for index, (name, seconds) in enumerate(self.templates):
+            metrics.append((f'tpl-{index}', seconds, name))
+        return metrics
+
+
+def current():
+    return getattr(_local, 'timings', None)
+
+
+def server_timing(metrics):
+    parts = []
+    for name, seconds, description in metrics:
+        part = f'{name};dur={seconds * 1000:.2f}'
+        if description:
+            escaped = description.replace('\\', '\\\\').replace('"', '\\"')
+            part += f';desc="{escaped}"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = current()
+        if timings is None or timings.depth['template']:
+            return super().render(context, request)
+        timings.depth['template'] += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.depth['template'] -= 1
+            timings.templates.append(
+                (self.template.name, time.perf_counter() - started)
+            )
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Бэкенд DjangoTemplates, засекающий отрисовку верхних шаблонов.
+
+    Сигнал template_rendered Django отправляет только в тестах,
+    поэтому время снимается на уровне шаблона бэкенда.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+def _timed_method(name, kind):
+    def method(self, *args, **kwargs):
+        parent = getattr(super(TimedCacheMixin, self), name)
+        timings = current()
+        if timings is None or timings.depth['cache']:
+            return parent(*args, **kwargs)
+        timings.depth['cache'] += 1
+        started = time.perf_counter()
+        try:
+            return parent(*args, **kwargs)
+        finally:
+            timings.depth['cache'] -= 1
+            timings.cache[kind][0] += time.perf_counter() - started
+            timings.cache[kind][1] += 1
+    method.__name__ = name
+    return method
+
+
+class TimedCacheMixin:
+    """Засекает время операций кеша внутри запроса с Server-Timing."""
+
+
+for _name, _kind in CACHE_OPERATIONS.items():
+    setattr(TimedCacheMixin, _name, _timed_method(_name, _kind))
+
+
+class TimedFileBasedCache(TimedCacheMixin, AtomicFileBasedCache):
+    pass
+
+
+class TimedTwoTierCache(TimedCacheMixin, TwoTierCache):
+    pass
+
+
+class ServerTimingMiddleware:
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = _local.timings = RequestTimings()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timings.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            _local.timings = None
+        metrics = timings.metrics(time.perf_counter() - timings.started)
+        response['Server-Timing'] = server_timing(metrics)
+        self.log(request, response, timings, metrics)
+        return response
+
+    def log(self, request, response, timings, metrics):
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timings.queries,
+        }
+        for name, seconds, description in metrics:
+            record[f'{name}_ms'] = round(seconds * 1000, 2)
+            if name.startswith('tpl-'):
+                record[f'{name}_name'] = description
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+class ServerTimingViewMiddleware:
+    """Последний в MIDDLEWARE: засекает время после всех middleware."""
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = current()
+        if timings is None:
+            return self.get_response(request)
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            timings.inner += time.perf_counter() - started
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .metrics import CONTENT_TYPE, registry
+
+
+def _metrics_response(request):
+    return HttpResponse(registry.exposition(), content_type=CONTENT_TYPE)
+
+
+_staff_metrics = staff_member_required(_metrics_response)
+
+
+@require_GET
+def metrics_view(request):
+    """Метрики для администраторов или сборщика с METRICS_TOKEN."""
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ):
+        return _metrics_response(request)
+    return _staff_metrics(request)
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from pages.prerender import (
+    ANONYMOUS, AUTHENTICATED, ERROR_TEMPLATES, STATIC_PAGES,
+    save_page, save_static_page,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее отрисовывает страницы ошибок и статические страницы, '
+        'чтобы отдавать их без шаблонизатора и базы данных.'
+    )
+
+    def handle(self, *args, **options):
+        for template_name in ERROR_TEMPLATES:
+            for login_state in (ANONYMOUS, AUTHENTICATED):
+                path, size = save_page(template_name, login_state)
+                self.stdout.write(
+                    f'{template_name} [{login_state}] -> {path} '
+                    f'({size} байт)'
+                )
+        for view_name in STATIC_PAGES:
+            for login_state in (ANONYMOUS, AUTHENTICATED):
+                path, size = save_static_page(view_name, login_state)
+                self.stdout.write(
+                    f'{view_name} [{login_state}] -> {path} ({size} байт)'
+                )
@@ -0,0 +1,25 @@
+from django.conf import settings
+
+from .prerender import static_page_response, static_page_view_name
+
+
+class PrerenderedPagesMiddleware:
+    """Отдаёт анонимам заготовленные статические страницы.
+
+    Стоит до сессий и аутентификации: запрос без сессионной cookie
+    завершается здесь, не доходя до базы данных и шаблонизатора.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            settings.PRERENDERED_STATIC_PAGES
+            and request.method in ('GET', 'HEAD')
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        ):
+            view_name = static_page_view_name(request.path_info)
+            if view_name is not None:
+                return static_page_response(request, view_name, False)
+        return self.get_response(request)
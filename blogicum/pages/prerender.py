@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.html import escape
+
+from core.holes import fill_holes
+
+REQUEST_URL_PLACEHOLDER = '__prerendered_request_url__'
+
+# Отдаётся, если шаблон не удалось отрисовать даже один раз.
+FALLBACK_PAGE = (
+    '<!DOCTYPE html><html lang="ru"><head><meta charset="utf-8">'
+    '<title>Блогикум</title></head><body><h1>{title}</h1>'
+    '<a href="/">Вернуться на главную</a></body></html>'
+)
+
+ERROR_TEMPLATES = [
+    'pages/404.html',
+    'pages/403csrf.html',
+    'pages/500.html',
+]
+
+# Страницы ошибок и статические страницы зависят только от шапки:
+# анонимный вариант отрисовывается целиком, в варианте для авторизованных
+# шапка остаётся дырой и заполняется для каждого запроса.
+STATIC_PAGES = {
+    'pages:about': 'pages/about.html',
+    'pages:rules': 'pages/rules.html',
+}
+
+ANONYMOUS = 'anonymous'
+AUTHENTICATED = 'authenticated'
+
+logger = logging.getLogger(__name__)
+
+_pages = {}
+_lock = threading.Lock()
+
+
+class _PlaceholderRequest:
+    """Заменяет request при отрисовке: шаблон не должен знать о запросе."""
+
+    path = '/'
+
+    def __init__(self, view_name=None, punch_holes=False):
+        self.resolver_match = (
+            SimpleNamespace(view_name=view_name) if view_name else None
+        )
+        self.punch_holes = punch_holes
+
+    def build_absolute_uri(self, location=None):
+        return REQUEST_URL_PLACEHOLDER
+
+
+def render_page(template_name, view_name=None, punch_holes=False):
+    return render_to_string(template_name, {
+        'user': AnonymousUser(),
+        'request': _PlaceholderRequest(view_name, punch_holes),
+    }).encode('utf-8')
+
+
+def page_path(name):
+    return Path(settings.PRERENDERED_PAGES_DIR) / name
+
+
+def _store(name, content):
+    path = page_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    with _lock:
+        _pages[name] = content
+    return path, len(content)
+
+
+def _load(name, render):
+    content = _pages.get(name)
+    if content is not None:
+        return content
+    with _lock:
+        content = _pages.get(name)
+        if content is None:
+            path = page_path(name)
+            content = path.read_bytes() if path.is_file() else render()
+            _pages[name] = content
+        return content
+
+
+def error_page_name(template_name, login_state):
+    return f'{login_state}/{template_name}'
+
+
+def render_error_page(template_name, login_state):
+    return render_page(
+        template_name, punch_holes=login_state == AUTHENTICATED
+    )
+
+
+def save_page(template_name, login_state=ANONYMOUS):
+    """Отрисовывает страницу и сохраняет её на диск для всех процессов."""
+    return _store(
+        error_page_name(template_name, login_state),
+        render_error_page(template_name, login_state),
+    )
+
+
+def static_page_name(view_name, login_state):
+    return f'{login_state}/{STATIC_PAGES[view_name]}'
+
+
+def render_static_page(view_name, login_state):
+    return render_page(
+        STATIC_PAGES[view_name], view_name,
+        punch_holes=login_state == AUTHENTICATED,
+    )
+
+
+def save_static_page(view_name, login_state):
+    return _store(
+        static_page_name(view_name, login_state),
+        render_static_page(view_name, login_state),
+    )
+
+
+def get_page(template_name, fallback_title, login_state=ANONYMOUS):
+    try:
+        return _load(
+            error_page_name(template_name, login_state),
+            lambda: render_error_page(template_name, login_state),
+        )
+    except Exception:
+        logger.exception('Не удалось подготовить страницу %s', template_name)
+        return FALLBACK_PAGE.format(title=fallback_title).encode('utf-8')
+
+
+def get_static_page(view_name, login_state):
+    return _load(
+        static_page_name(view_name, login_state),
+        lambda: render_static_page(view_name, login_state),
+    )
+
+
+def _is_authenticated(request):
+    # Ошибка 500 могла случиться при чтении самой сессии.
+    try:
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_authenticated
+    except Exception:
+        return False
+
+
+def _fill_header(content, request):
+    try:
+        return fill_holes(content.decode('utf-8'), request).encode('utf-8')
+    except Exception:
+        logger.exception('Не удалось отрисовать шапку страницы ошибки')
+        return None
+
+
+def _page_content(request, template_name, fallback_title):
+    if _is_authenticated(request):
+        content = _fill_header(
+            get_page(template_name, fallback_title, AUTHENTICATED), request
+        )
+        if content is not None:
+            return content
+    return get_page(template_name, fallback_title)
+
+
+def prerendered_response(request, template_name, status, fallback_title):
+    """Готовая страница без шаблонизатора и базы данных.
+
+    Анонимам отдаются готовые байты; авторизованным дорисовывается шапка.
+    """
+    content = _page_content(request, template_name, fallback_title)
+    placeholder = REQUEST_URL_PLACEHOLDER.encode('utf-8')
+    if placeholder in content:
+        try:
+            url = request.build_absolute_uri()
+        except Exception:
+            url = request.path
+        content = content.replace(placeholder, escape(url).encode('utf-8'))
+    return HttpResponse(
+        content, status=status, content_type='text/html; charset=utf-8'
+    )
+
+
+def static_page_response(request, view_name, authenticated):
+    """Заготовленная статическая страница с долгоживущими заголовками."""
+    max_age = settings.PRERENDERED_PAGES_MAX_AGE
+    if not authenticated:
+        content = get_static_page(view_name, ANONYMOUS)
+        response = HttpResponse(content)
+        response['ETag'] = '"%s"' % hashlib.md5(content).hexdigest()
+        patch_cache_control(response, public=True, max_age=max_age)
+    else:
+        content = get_static_page(view_name, AUTHENTICATED)
+        response = HttpResponse(fill_holes(content.decode('utf-8'), request))
+        patch_cache_control(response, private=True, max_age=max_age)
+    # Одна и та же страница по-разному выглядит до и после входа.
+    patch_vary_headers(response, ('Cookie',))
+    if not authenticated:
+        return get_conditional_response(
+            request, etag=response['ETag'], response=response
+        )
+    return response
+
+
+_paths = {}
+
+
+def static_page_view_name(path):
+    """Имя маршрута статической страницы по пути запроса или None."""
+    if not _paths:
+        _paths.update(
+            (reverse(view_name), view_name) for view_name in STATIC_PAGES
+        )
+    return _paths.get(path)
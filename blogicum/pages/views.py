@@ -1,22 +1,51 @@
+from django.conf import settings
 from django.shortcuts import render
 from django.views.generic import TemplateView
 
+from .prerender import prerendered_response, static_page_response
 
-class About(TemplateView):
+
+class PrerenderedPageMixin:
+    """Отдаёт заготовленную командой prerender_pages страницу."""
+
+    def get(self, request, *args, **kwargs):
+        if settings.PRERENDERED_STATIC_PAGES:
+            # Профиль маршрута может отключить аутентификацию.
+            user = getattr(request, 'user', None)
+            return static_page_response(
+                request, request.resolver_match.view_name,
+                user is not None and user.is_authenticated,
+            )
+        return super().get(request, *args, **kwargs)
+
+
+class About(PrerenderedPageMixin, TemplateView):
     template_name = 'pages/about.html'
 
 
-class Rules(TemplateView):
+class Rules(PrerenderedPageMixin, TemplateView):
     template_name = 'pages/rules.html'
 
 
 def page_not_found(request, exception):
+    if settings.PRERENDERED_ERROR_PAGES:
+        return prerendered_response(
+            request, 'pages/404.html', 404, 'Страница не найдена'
+        )
     return render(request, 'pages/404.html', status=404)
 
 
 def csrf_failure(request, reason=''):
+    if settings.PRERENDERED_ERROR_PAGES:
+        return prerendered_response(
+            request, 'pages/403csrf.html', 403, 'Ошибка CSRF токена. 403'
+        )
     return render(request, 'pages/403csrf.html', status=403)
 
 
 def server_error(request):
+    if settings.PRERENDERED_ERROR_PAGES:
+        return prerendered_response(
+            request, 'pages/500.html', 500, 'Ошибка сервера'
+        )
     return render(request, 'pages/500.html', status=500)
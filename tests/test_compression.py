@@ -0,0 +1,54 @@
+import gzip
+
+import pytest
+
+from core.middleware import minify_html
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_minify_html_keeps_preformatted_blocks():
+    html = (
+        '<div>\n    <p>Текст   с  пробелами</p>\n\n'
+        '<textarea>  строка\n    вторая</textarea>\n'
+        '<pre>  a\n  b</pre>\n</div>'
+    )
+    minified = minify_html(html)
+    assert '<div>\n<p>Текст с пробелами</p>\n' in minified, (
+        'Убедитесь, что незначимые пробелы и отступы схлопываются.'
+    )
+    assert '<textarea>  строка\n    вторая</textarea>' in minified, (
+        'Убедитесь, что содержимое `<textarea>` не изменяется.'
+    )
+    assert '<pre>  a\n  b</pre>' in minified, (
+        'Убедитесь, что содержимое `<pre>` не изменяется.'
+    )
+
+
+def test_minify_html_keeps_attribute_values():
+    html = (
+        '<input  type="text"\n       value="a   b"\n'
+        "       title='x  >  y'>  текст   <b>жирный</b>"
+    )
+    assert minify_html(html) == (
+        '<input type="text" value="a   b" title=\'x  >  y\'> текст <b>жирный</b>'
+    ), 'Убедитесь, что пробелы в значениях атрибутов не изменяются.'
+
+
+def test_index_is_gzipped_when_accepted(client):
+    response = client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip', (
+        'Убедитесь, что ответ сжимается, если клиент поддерживает gzip.'
+    )
+    assert 'Accept-Encoding' in response['Vary']
+    html = gzip.decompress(response.content).decode('utf-8')
+    assert '<html' in html
+
+
+def test_index_is_not_compressed_without_accept_encoding(client):
+    response = client.get('/')
+    assert not response.has_header('Content-Encoding')
+    assert '\n    ' not in response.content.decode('utf-8'), (
+        'Убедитесь, что отступы шаблонов удаляются из HTML-ответа.'
+    )
@@ -0,0 +1,90 @@
+import pytest
+from django.conf import settings
+from django.template import Context, Template
+from django.test import override_settings
+
+from core.css import UsedSelectors, purge_css
+from core.templatetags import stylesheets
+
+HEAD = Template(
+    '{% load stylesheets %}{% critical_css %}{% bootstrap_stylesheet %}'
+)
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / 'css').mkdir()
+    stylesheets._find_static.cache_clear()
+    stylesheets._read_static.cache_clear()
+    with override_settings(
+        STATICFILES_DIRS=[tmp_path, *settings.STATICFILES_DIRS]
+    ):
+        yield tmp_path / 'css'
+    stylesheets._find_static.cache_clear()
+    stylesheets._read_static.cache_clear()
+
+
+def test_purge_css_keeps_only_used_selectors():
+    used = UsedSelectors()
+    used.update_from_html(
+        '<div class="card {% if x %}active{% endif %}"><p>text</p></div>'
+    )
+    css = (
+        '@charset "UTF-8";/* comment */'
+        ':root{--a:1}p{margin:0}table{width:100%}'
+        '.card,.modal{display:block}.card.active{color:red}'
+        '.btn:not(:disabled){cursor:pointer}'
+        '@media (min-width:576px){.card{padding:0}.modal{margin:0}}'
+        '@media print{.modal{display:none}}'
+        '@keyframes spin{to{transform:rotate(360deg)}}'
+    )
+    purged = purge_css(css, used)
+    assert purged == (
+        '@charset "UTF-8";'
+        ':root{--a:1}p{margin:0}'
+        '.card{display:block}.card.active{color:red}'
+        '@media (min-width:576px){.card{padding:0}}'
+        '@keyframes spin{to{transform:rotate(360deg)}}'
+    ), 'Убедитесь, что из CSS удаляются правила с неиспользуемыми классами.'
+
+
+def test_pages_fall_back_to_full_stylesheet(client):
+    with override_settings(PURGED_CSS='css/missing.css'):
+        content = client.get('/pages/about/').content.decode('utf-8')
+    assert 'css/bootstrap.min.css' in content, (
+        'Убедитесь, что без собранного CSS подключается полный bootstrap.'
+    )
+
+
+def test_stylesheet_does_not_block_render_with_critical_css(static_dir):
+    (static_dir / 'critical.css').write_text('body{margin:0}')
+    (static_dir / 'bootstrap.purged.css').write_text('.card{color:red}')
+    head = HEAD.render(Context())
+    assert '<style>body{margin:0}</style>' in head
+    assert 'rel="stylesheet" href' not in head.split('<noscript>')[0], (
+        'Убедитесь, что при встроенном критическом CSS основной файл '
+        'не блокирует отрисовку.'
+    )
+    assert 'rel="preload"' in head and 'css/bootstrap.purged.css' in head
+    assert (
+        '<noscript><link rel="stylesheet" '
+        'href="/static/css/bootstrap.purged.css"></noscript>'
+    ) in head, 'Убедитесь, что без JavaScript CSS подключает <noscript>.'
+
+
+def test_stylesheet_blocks_render_without_critical_css(static_dir):
+    head = HEAD.render(Context())
+    assert head == (
+        '<link rel="stylesheet" href="/static/css/bootstrap.min.css">'
+    ), 'Убедитесь, что без критического CSS файл подключается как обычно.'
+
+
+def test_built_css_is_picked_up_without_restart(static_dir):
+    assert 'bootstrap.min.css' in HEAD.render(Context())
+    (static_dir / 'critical.css').write_text('body{margin:0}')
+    (static_dir / 'bootstrap.purged.css').write_text('.card{color:red}')
+    head = HEAD.render(Context())
+    assert '<style>' in head and 'bootstrap.purged.css' in head, (
+        'Убедитесь, что отсутствие собранного CSS не запоминается '
+        'до перезапуска сервера.'
+    )
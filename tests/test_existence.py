@@ -0,0 +1,146 @@
+import pytest
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.existence import RECENT_POST_PREFIX, existence
+from core.bloom import BloomFilter, IdBitmap
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    # Отметки новых постов переживают откат БД, а id в тестах повторяются.
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    names = [f'user{index}' for index in range(1000)]
+    for name in names:
+        bloom.add(name)
+    assert all(name in bloom for name in names)
+    false_positives = sum(
+        f'missing{index}' in bloom for index in range(10000)
+    )
+    assert false_positives < 300, (
+        'Убедитесь, что доля ложных срабатываний близка к заданной.'
+    )
+    assert bloom.false_positive_rate < 0.02
+
+
+def test_id_bitmap_grows_on_add():
+    bitmap = IdBitmap(10)
+    bitmap.add(3)
+    bitmap.add(1000)
+    assert 3 in bitmap and 1000 in bitmap
+    assert 4 not in bitmap and 5000 not in bitmap
+    assert bitmap.count == 2
+
+
+def test_missing_post_and_profile_skip_database(mixer, client):
+    posts = mixer.cycle(3).blend('blog.Post')
+    existence.rebuild()
+    missing_id = posts[1].id
+    posts[1].delete()
+    existence.rebuild()
+    with CaptureQueriesContext(connection) as captured:
+        assert client.get(f'/posts/{missing_id}/').status_code == 404
+        assert client.get('/profile/no-such-user/').status_code == 404
+    assert not [
+        query for query in captured.captured_queries
+        if 'blog_post' in query['sql'] or 'auth_user' in query['sql']
+    ], 'Убедитесь, что 404 для несуществующих объектов не обращается к БД.'
+
+
+CACHE_METHODS = (
+    'get', 'get_many', 'set', 'set_many', 'add', 'incr', 'delete',
+    'has_key',
+)
+
+
+@pytest.fixture
+def cache_calls(monkeypatch):
+    calls = []
+    for alias in ('default', 'hot'):
+        backend = caches[alias]
+        for name in CACHE_METHODS:
+            method = getattr(backend, name)
+
+            def spy(*args, _method=method, _name=f'{alias}.{name}', **kw):
+                calls.append(_name)
+                return _method(*args, **kw)
+            monkeypatch.setattr(backend, name, spy)
+    return calls
+
+
+def test_bogus_id_skips_page_cache(
+    settings, mixer, client, cache_calls, django_assert_num_queries
+):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    posts = mixer.cycle(3).blend('blog.Post')
+    missing_id = posts[1].id
+    posts[1].delete()
+    existence.rebuild()
+    cache_calls.clear()
+    with django_assert_num_queries(0):
+        response = client.get(f'/posts/{missing_id}/')
+    assert response.status_code == 404
+    assert not cache_calls, (
+        'Убедитесь, что проверка индекса существования выполняется до '
+        f'кеша страниц; обращения к кешу: {cache_calls}'
+    )
+
+
+def test_bogus_username_skips_database(
+    settings, mixer, client, django_assert_num_queries
+):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    mixer.blend('blog.Post')
+    existence.rebuild()
+    with django_assert_num_queries(0):
+        response = client.get('/profile/no-such-user/')
+    assert response.status_code == 404, (
+        'Убедитесь, что профиль несуществующего пользователя возвращает 404 '
+        'без обращения к БД и кешу страниц.'
+    )
+
+
+def test_new_objects_are_visible_without_rebuild(mixer, client):
+    existence.rebuild()
+    user = mixer.blend('auth.User')
+    post = mixer.blend('blog.Post', is_published=True, author=user)
+    assert existence.user_may_exist(user.username)
+    assert existence.post_may_exist(post.id)
+    assert client.get(f'/profile/{user.username}/').status_code == 200
+
+
+def test_ids_above_max_skip_database(mixer, client, django_assert_num_queries):
+    post = mixer.blend('blog.Post', is_published=True)
+    existence.rebuild()
+    with django_assert_num_queries(0):
+        assert client.get('/posts/99999999/').status_code == 404
+        assert client.get(f'/posts/{post.id + 1}/').status_code == 404, (
+            'Убедитесь, что id больше известного максимума отсекаются '
+            'без запроса к БД.'
+        )
+    new_post = mixer.blend('blog.Post', is_published=True)
+    assert existence.max_post_id == new_post.id
+    assert client.get(f'/posts/{new_post.id}/').status_code == 200
+
+
+def test_posts_from_other_processes_are_visible(mixer):
+    mixer.blend('blog.Post')
+    existence.rebuild()
+    other_id = existence.max_post_id + 5
+    # Так пост, созданный в другом процессе, отмечается в общем кеше.
+    cache.set(f'{RECENT_POST_PREFIX}:{other_id}', 1)
+    assert existence.post_may_exist(other_id), (
+        'Убедитесь, что посты, созданные в других процессах после сборки '
+        'индекса, не отсекаются.'
+    )
+    assert existence.max_post_id == other_id
+    assert not existence.post_may_exist(other_id + 1)
@@ -0,0 +1,76 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def staff_client(mixer):
+    staff = mixer.blend('auth.User', is_staff=True, is_active=True)
+    client = Client()
+    client.force_login(staff)
+    return client
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+def test_export_is_staff_only(user_client):
+    response = user_client.get('/export/')
+    assert response.status_code == 302, (
+        'Убедитесь, что выгрузка доступна только администраторам.'
+    )
+
+
+def test_export_ndjson(staff_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post)
+    response = staff_client.get('/export/')
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in content(response).splitlines()]
+    assert {'type': 'posts', 'id': post.id} == {
+        key: rows[0][key] for key in ('type', 'id')
+    }
+    assert rows[-1]['type'] == 'comments'
+    assert rows[-1]['text'] == comment.text
+
+
+def test_export_csv_gzip_since(
+    staff_client, many_posts_with_published_locations
+):
+    last = max(post.id for post in many_posts_with_published_locations)
+    response = staff_client.get(
+        '/export/', {'kind': 'posts', 'format': 'csv', 'gzip': '1',
+                     'since_id': last - 2}
+    )
+    assert response['Content-Type'] == 'application/gzip'
+    rows = list(csv.reader(io.StringIO(
+        gzip.decompress(content(response)).decode('utf-8')
+    )))
+    assert rows[0][0] == 'id'
+    assert [int(row[0]) for row in rows[1:]] == [last - 1, last], (
+        'Убедитесь, что since_id выгружает только новые объекты.'
+    )
+
+
+def test_export_rejects_bad_params(staff_client):
+    assert staff_client.get('/export/', {'format': 'xml'}).status_code == 400
+    assert staff_client.get(
+        '/export/', {'since': 'вчера'}
+    ).status_code == 400
+
+
+def test_export_command(tmp_path, post_with_published_location):
+    output = tmp_path / 'posts.ndjson'
+    call_command(
+        'export_blog', kind='posts', output=str(output), stderr=io.StringIO()
+    )
+    [row] = [json.loads(line) for line in output.read_text().splitlines()]
+    assert row['id'] == post_with_published_location.id
@@ -0,0 +1,137 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from blog.caching import FEED
+from blog.models import Category, Post
+from core.generations import get_generations
+from core.fixtures import dependency_order, iter_json_array
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_iter_json_array_streams_small_chunks():
+    data = [12, {'text': 'Текст, [со] скобками'}, 'x', 345]
+    stream = io.StringIO(json.dumps(data, ensure_ascii=False))
+    assert list(iter_json_array(stream, read_size=3)) == data, (
+        'Убедитесь, что массив читается по частям без потери элементов.'
+    )
+
+
+def test_dependency_order():
+    assert dependency_order([Post, Category]).index(Category) < (
+        dependency_order([Post, Category]).index(Post)
+    )
+
+
+def write_fixture(tmp_path, user, category_id):
+    now = timezone.now().isoformat()
+    records = [
+        # Пост раньше своей категории: загрузчик должен упорядочить их.
+        {'model': 'blog.post', 'pk': 501, 'fields': {
+            'author': user.id, 'category': category_id, 'location': None,
+            'title': 'Заголовок', 'text': 'Текст', 'pub_date': now,
+            'created_at': now, 'is_published': True, 'image': '',
+        }},
+        {'model': 'blog.category', 'pk': category_id, 'fields': {
+            'title': 'Категория', 'description': 'Описание',
+            'slug': 'fast', 'is_published': True, 'created_at': now,
+        }},
+        {'model': 'auth.user', 'pk': user.id, 'fields': {
+            'username': user.username, 'password': user.password,
+            'first_name': 'Обновлённое', 'last_name': '', 'email': '',
+            'is_superuser': False, 'is_staff': False, 'is_active': True,
+            'date_joined': now, 'last_login': None,
+            'groups': [], 'user_permissions': [],
+        }},
+    ]
+    path = tmp_path / 'fixture.json'
+    path.write_text(json.dumps(records), encoding='utf-8')
+    return str(path)
+
+
+def test_fastloaddata(tmp_path, user):
+    received = []
+
+    def receiver(sender, **kwargs):
+        received.append(sender)
+
+    post_save.connect(receiver, sender=Post)
+    try:
+        call_command(
+            'fastloaddata', write_fixture(tmp_path, user, 301),
+            batch_size=2, stdout=io.StringIO(),
+        )
+    finally:
+        post_save.disconnect(receiver, sender=Post)
+    post = Post.objects.get(pk=501)
+    assert post.category.slug == 'fast'
+    user.refresh_from_db()
+    assert user.first_name == 'Обновлённое', (
+        'Убедитесь, что существующие объекты обновляются, как в loaddata.'
+    )
+    assert not received, 'Без --signals сигналы моделей не отправляются.'
+    assert Category.objects.create(
+        title='Ещё', description='', slug='next'
+    ).pk == 302, 'Убедитесь, что последовательности id сдвинуты.'
+
+
+def test_loaddata_with_posts_before_authors(tmp_path):
+    now = timezone.now().isoformat()
+    records = [
+        {'model': 'blog.post', 'pk': 601, 'fields': {
+            'author': 901, 'category': None, 'location': None,
+            'title': 'Заголовок', 'text': 'Текст', 'pub_date': now,
+            'created_at': now, 'is_published': True, 'image': '',
+        }},
+        {'model': 'auth.user', 'pk': 901, 'fields': {
+            'username': 'loaded', 'password': '', 'date_joined': now,
+        }},
+    ]
+    path = tmp_path / 'fixture.json'
+    path.write_text(json.dumps(records), encoding='utf-8')
+    before = get_generations([FEED])[FEED]
+    call_command('loaddata', str(path), stdout=io.StringIO())
+    assert Post.objects.get(pk=601).author.username == 'loaded', (
+        'Убедитесь, что loaddata загружает посты раньше их авторов.'
+    )
+    assert get_generations([FEED])[FEED] != before, (
+        'Убедитесь, что после loaddata кеши лент сбрасываются.'
+    )
+
+
+def test_fastloaddata_keeps_fixture_dates(tmp_path, user):
+    path = write_fixture(tmp_path, user, 311)
+    with open(path, encoding='utf-8') as fp:
+        records = json.load(fp)
+    for record in records:
+        if 'created_at' in record['fields']:
+            record['fields']['created_at'] = '2022-03-01T10:00:00Z'
+    with open(path, 'w', encoding='utf-8') as fp:
+        json.dump(records, fp)
+
+    def created_at():
+        return (
+            Post.objects.get(pk=501).created_at,
+            Category.objects.get(pk=311).created_at,
+        )
+
+    call_command('loaddata', path, stdout=io.StringIO())
+    expected = created_at()
+    Post.objects.filter(pk=501).delete()
+    Category.objects.filter(pk=311).delete()
+    call_command('fastloaddata', path, stdout=io.StringIO())
+    assert created_at() == expected, (
+        'Убедитесь, что fastloaddata сохраняет created_at из фикстуры, '
+        'как loaddata.'
+    )
+    assert expected[1].year == 2022
+    assert Category.objects.create(
+        title='Новая', description='', slug='new'
+    ).created_at.year == timezone.now().year, (
+        'Убедитесь, что auto_now_add снова работает после загрузки.'
+    )
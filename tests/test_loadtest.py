@@ -0,0 +1,44 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.loadtest import percentile
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([], 0.5) is None
+
+
+def test_loadtest_command(
+    settings, tmp_path, user, many_posts_with_published_locations
+):
+    settings.MEDIA_ROOT = tmp_path / 'media'
+    output = tmp_path / 'result.json'
+    call_command(
+        'loadtest', iterations=30, seed=1, output=str(output),
+        stdout=StringIO(),
+    )
+    result = json.loads(output.read_text(encoding='utf-8'))
+    assert result['requests'] >= 30
+    assert 'blog:index' in result['urls'], (
+        'Убедитесь, что результаты сгруппированы по именам маршрутов.'
+    )
+    stats = result['urls']['blog:index']
+    assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms']
+    assert stats['queries_per_request'] > 0
+    assert not any(url['errors'] for url in result['urls'].values()), (
+        'Убедитесь, что сценарии нагрузочного теста не приводят к ошибкам.'
+    )
+    out = StringIO()
+    call_command(
+        'loadtest', iterations=5, seed=1, scenario=['static_pages'],
+        compare=str(output), stdout=out,
+    )
+    assert 'pages:about: p50_ms' in out.getvalue()
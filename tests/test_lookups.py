@@ -0,0 +1,94 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.forms import PostForm
+
+pytestmark = [pytest.mark.django_db]
+
+
+def lookup_queries(captured):
+    return [
+        query['sql'] for query in captured.captured_queries
+        if query['sql'].lstrip().startswith('SELECT')
+        and ('FROM "blog_category"' in query['sql']
+             or 'FROM "blog_location"' in query['sql'])
+    ]
+
+
+def test_post_form_uses_cached_lookups(
+    user_client, published_category, published_location
+):
+    user_client.get('/posts/create/')
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.get('/posts/create/')
+    content = response.content.decode('utf-8')
+    assert published_category.title in content
+    assert published_location.name in content
+    assert not lookup_queries(captured), (
+        'Убедитесь, что форма поста не запрашивает категории и'
+        ' местоположения из базы при каждом показе.'
+    )
+
+
+def test_category_page_uses_cached_lookups(client, mixer):
+    category = mixer.blend('blog.Category', is_published=True)
+    client.get(f'/category/{category.slug}/')
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(f'/category/{category.slug}/')
+    assert response.status_code == 200
+    assert not lookup_queries(captured)
+
+    category.is_published = False
+    category.save()
+    assert client.get(f'/category/{category.slug}/').status_code == 404, (
+        'Убедитесь, что изменение категории сбрасывает закешированный'
+        ' справочник.'
+    )
+
+
+def test_replaced_queryset_is_respected(published_category):
+    form = PostForm()
+    field = form.fields['category']
+    field.queryset = field.queryset.none()
+    with CaptureQueriesContext(connection) as captured:
+        choices = list(field.choices)
+    assert choices == [('', field.empty_label)], (
+        'Убедитесь, что поле с заменённым queryset не берёт варианты '
+        'из справочников.'
+    )
+    assert not captured.captured_queries
+    assert list(PostForm().fields['category'].choices)[1:], (
+        'Убедитесь, что замена queryset не влияет на другие формы.'
+    )
+
+
+@pytest.mark.parametrize('page', ['category', 'profile'])
+def test_cold_cards_do_not_query_lookups(settings, client, mixer, page):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    user = mixer.blend('auth.User')
+    category = mixer.blend('blog.Category', is_published=True)
+    locations = mixer.cycle(3).blend('blog.Location', is_published=True)
+    for index in range(9):
+        mixer.blend(
+            'blog.Post', author=user, category=category,
+            location=locations[index % 3], is_published=True,
+        )
+    url = (
+        f'/category/{category.slug}/' if page == 'category'
+        else f'/profile/{user.username}/'
+    )
+    client.get(url)
+    caches['default'].clear()
+    caches['hot'].clear()
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert len(lookup_queries(captured)) <= 2, (
+        'Убедитесь, что карточки берут категории и местоположения '
+        'из справочников, а не запросом на каждый пост.'
+    )
+    assert len(captured.captured_queries) <= 6, (
+        'Убедитесь, что страница без кеша не делает запрос на каждый пост.'
+    )
@@ -0,0 +1,77 @@
+import uuid
+
+import pytest
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.db import connection
+from django.http import HttpRequest, HttpResponse
+from django.test.utils import CaptureQueriesContext
+
+from core.messages import SignedCookieStorage
+
+SESSION_WRITES = ('INSERT INTO "django_session"', 'UPDATE "django_session"')
+
+
+def stored_messages(response):
+    request = HttpRequest()
+    request.COOKIES = {
+        key: morsel.value for key, morsel in response.cookies.items()
+    }
+    return list(SignedCookieStorage(request))
+
+
+def test_long_message_is_truncated(settings):
+    settings.MESSAGE_MAX_LENGTH = 10
+    storage = SignedCookieStorage(HttpRequest())
+    storage.add(constants.SUCCESS, 'Очень длинное сообщение')
+    response = HttpResponse()
+    storage.update(response)
+    [message] = stored_messages(response)
+    assert message.message == 'Очень дли…'
+    assert message.level == constants.SUCCESS
+
+
+def test_overflow_drops_oldest(settings):
+    settings.MESSAGE_COOKIE_MAX_SIZE = 300
+    storage = SignedCookieStorage(HttpRequest())
+    for number in range(20):
+        storage.add(constants.INFO, f'Сообщение {number} {uuid.uuid4()}')
+    response = HttpResponse()
+    assert storage._store(
+        [Message(constants.INFO, 'x')], HttpResponse()
+    ) == []
+    storage.update(response)
+    assert len(response.cookies['messages'].value) <= 300
+    messages = [message.message for message in stored_messages(response)]
+    assert messages and messages[-1].startswith('Сообщение 19 '), (
+        'Убедитесь, что при переполнении cookie отбрасываются '
+        'самые старые сообщения.'
+    )
+    assert not messages[0].startswith('Сообщение 0 ')
+
+
+@pytest.mark.django_db
+def test_comment_round_trip_without_session_writes(
+    settings, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    # Сообщения не выводятся в шаблонах и копятся в cookie,
+    # поэтому серия комментариев доводит её до переполнения.
+    settings.MESSAGE_COOKIE_MAX_SIZE = 200
+    with CaptureQueriesContext(connection) as queries:
+        for number in range(10):
+            response = user_client.post(
+                f'/posts/{post.id}/comment/',
+                {'text': f'Комментарий {number}'},
+                follow=True,
+            )
+            assert response.status_code == 200
+    writes = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith(SESSION_WRITES)
+    ]
+    assert not writes, (
+        'Убедитесь, что добавление комментария и переход на страницу поста '
+        'не записывают сообщения в сессию.'
+    )
+    assert post.comments.count() == 10
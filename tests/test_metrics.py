@@ -0,0 +1,139 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+from django.core.cache import caches
+from django.test import Client
+
+from core.metrics import (
+    MmapValues, cache_requests, registry, requests_in_progress, responses,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+@pytest.fixture
+def staff_client(mixer):
+    staff = mixer.blend('auth.User', is_staff=True, is_active=True)
+    client = Client()
+    client.force_login(staff)
+    return client
+
+
+def increment_in_child():
+    responses.inc(view='blog:index', status=200)
+    requests_in_progress.inc()
+
+
+def test_metrics_are_staff_only(user_client, settings):
+    assert user_client.get('/metrics').status_code == 302, (
+        'Убедитесь, что метрики доступны только администраторам.'
+    )
+    settings.METRICS_TOKEN = 'secret'
+    response = Client().get(
+        '/metrics', HTTP_AUTHORIZATION='Bearer secret'
+    )
+    assert response.status_code == 200, (
+        'Убедитесь, что сборщик метрик может войти по METRICS_TOKEN.'
+    )
+
+
+def test_request_metrics(staff_client, many_posts_with_published_locations):
+    staff_client.get('/')
+    staff_client.get('/')
+    text = staff_client.get('/metrics').content.decode('utf-8')
+    assert (
+        'blogicum_responses_total{view="blog:index",status="200"} 2' in text
+    ), 'Убедитесь, что ответы считаются по представлениям и статусам.'
+    assert (
+        'blogicum_request_duration_seconds_bucket'
+        '{view="blog:index",le="+Inf"} 2' in text
+    ), 'Убедитесь, что гистограмма выводит накопленные интервалы.'
+    assert 'blogicum_request_duration_seconds_count{view="blog:index"} 2' in (
+        text
+    )
+    assert 'blogicum_db_queries_per_request_sum{view="blog:index"}' in text
+    assert 'blogicum_cache_requests_total{cache="hot",result=' in text, (
+        'Убедитесь, что считаются попадания и промахи кеша.'
+    )
+
+
+def test_metrics_from_processes_are_merged(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path
+    registry.reset()
+    responses.inc(view='blog:index', status=200)
+    requests_in_progress.inc()
+    child = multiprocessing.get_context('fork').Process(
+        target=increment_in_child
+    )
+    child.start()
+    child.join()
+    assert len(list(tmp_path.glob('*[0-9].db'))) == 2
+    text = registry.exposition()
+    assert (
+        'blogicum_responses_total{view="blog:index",status="200"} 2' in text
+    ), 'Убедитесь, что счётчики складываются по файлам всех процессов.'
+    assert 'blogicum_requests_in_progress 1' in text, (
+        'Убедитесь, что датчики завершившихся процессов не учитываются.'
+    )
+
+
+def test_two_tier_miss_is_counted_once():
+    caches['hot'].clear()
+    caches['hot'].generation('hot:1:missing')
+    before = registry.samples()
+    assert caches['hot'].get('missing:key') is None
+    after = registry.samples()
+    counted = {
+        json.dumps(json.loads(key)[2], ensure_ascii=False): value
+        - before.get(key, 0.0)
+        for key, value in after.items()
+        if json.loads(key)[0] == cache_requests.name
+        and value != before.get(key, 0.0)
+    }
+    assert list(counted.values()) == [1.0], (
+        'Убедитесь, что промах кеша из двух уровней считается один раз: '
+        f'{counted}'
+    )
+
+
+def test_gauges_of_reused_pid_are_dropped(settings, tmp_path):
+    settings.METRICS_DIR = tmp_path
+    stale = MmapValues(tmp_path / f'{os.getpid()}.gauges.db')
+    stale.set(requests_in_progress.key('', {}), 7)
+    registry.reset()
+    requests_in_progress.inc()
+    assert 'blogicum_requests_in_progress 1' in registry.exposition(), (
+        'Убедитесь, что процесс с повторно выданным pid не наследует '
+        'датчики завершившегося процесса.'
+    )
+    registry._remove_gauges(registry.gauges, os.getpid())
+    assert not (tmp_path / f'{os.getpid()}.gauges.db').exists(), (
+        'Убедитесь, что файл датчиков удаляется при выходе процесса.'
+    )
+
+
+def test_page_cache_metrics(staff_client, settings):
+    settings.PAGE_CACHE_TIMEOUT = 60
+    caches['default'].clear()
+    client = Client()
+    client.get('/')
+    client.get('/')
+    text = staff_client.get('/metrics').content.decode('utf-8')
+    assert 'blogicum_page_cache_requests_total{result="miss"} 1' in text, (
+        'Убедитесь, что промахи кеша страниц видны в метриках.'
+    )
+    assert (
+        'blogicum_page_cache_requests_total{result="fresh_hit"} 1' in text
+    ), 'Убедитесь, что попадания в кеш страниц видны в метриках.'
+    assert '# TYPE blogicum_page_cache_refresh_duration_seconds histogram' in (
+        text
+    )
@@ -0,0 +1,50 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client
+
+from core.profiles import check_profiles, route_profile
+
+
+def test_route_profile(settings):
+    settings.MIDDLEWARE_PROFILE_PATHS = {'/static/': 'bare'}
+    settings.ROUTE_MIDDLEWARE_PROFILES = {'pages:about': 'public'}
+    assert route_profile('/static/css/site.css') == 'bare'
+    assert route_profile('/pages/about/') == 'public'
+    assert route_profile('/pages/rules/') is None
+
+
+def test_profiles_require_session():
+    with pytest.raises(ImproperlyConfigured):
+        check_profiles({'broken': {'session', 'messages'}})
+
+
+@pytest.mark.django_db
+def test_bare_profile_skips_session_and_auth(settings, user_client):
+    settings.ROUTE_MIDDLEWARE_PROFILES = {'pages:about': 'bare'}
+    response = user_client.get('/pages/about/')
+    assert response.status_code == 200
+    assert not hasattr(response.wsgi_request, 'session'), (
+        'Убедитесь, что профиль маршрута отключает загрузку сессии.'
+    )
+    assert 'Войти' in response.content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_public_profile_keeps_auth(settings, user_client, user):
+    settings.ROUTE_MIDDLEWARE_PROFILES = {'pages:about': 'public'}
+    response = user_client.get('/pages/about/')
+    assert response.wsgi_request.user == user, (
+        'Убедитесь, что профиль `public` не отключает аутентификацию.'
+    )
+    assert not hasattr(response.wsgi_request, '_messages')
+
+
+@pytest.mark.django_db
+def test_csrf_is_checked_for_unsafe_methods(settings):
+    settings.ROUTE_MIDDLEWARE_PROFILES = {'pages:about': 'public'}
+    client = Client(enforce_csrf_checks=True)
+    response = client.post('/pages/about/')
+    assert response.status_code == 403, (
+        'Убедитесь, что профиль маршрута не отключает проверку CSRF '
+        'для изменяющих запросов.'
+    )
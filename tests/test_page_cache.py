@@ -0,0 +1,151 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.test import Client, override_settings
+from django.utils import timezone
+
+from blog.caching import (
+    author_namespace, index_dependencies, is_being_deleted,
+    profile_dependencies,
+)
+from core.metrics import registry
+from core.pagecache import page_cache_key, stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def page_cache():
+    cache.clear()
+    with override_settings(PAGE_CACHE_TIMEOUT=60):
+        yield
+    cache.clear()
+
+
+def test_post_page_is_shared_between_users(
+    page_cache, mixer, user, post_with_published_location,
+    user_client, another_user_client, client, django_assert_num_queries
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    url = f'/posts/{post.id}/'
+    edit_url = f'/posts/{post.id}/edit/'
+    comment_edit_url = f'/posts/{post.id}/edit_comment/{comment.id}/'
+
+    author_content = user_client.get(url).content.decode('utf-8')
+    assert edit_url in author_content
+    assert comment_edit_url in author_content
+    assert 'csrfmiddlewaretoken' in author_content
+
+    another_content = another_user_client.get(url).content.decode('utf-8')
+    assert edit_url not in another_content, (
+        'Убедитесь, что кнопки владельца не попадают в общий кеш страницы.'
+    )
+    assert comment_edit_url not in another_content
+    assert 'csrfmiddlewaretoken' in another_content, (
+        'Убедитесь, что форма комментария дорисовывается для пользователя.'
+    )
+
+    with django_assert_num_queries(0):
+        anonymous_content = client.get(url).content.decode('utf-8')
+    assert 'csrfmiddlewaretoken' not in anonymous_content
+    assert '<!--hole:' not in anonymous_content
+
+
+def test_unpublished_post_is_not_cached_for_others(
+    page_cache, mixer, user, user_client, client
+):
+    post = mixer.blend('blog.Post', author=user, is_published=False)
+    assert user_client.get(f'/posts/{post.id}/').status_code == 200
+    assert client.get(f'/posts/{post.id}/').status_code == 404, (
+        'Убедитесь, что страница неопубликованного поста, открытая автором,'
+        ' не отдаётся из кеша другим пользователям.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_stale_feed_is_served_and_refreshed_in_background(page_cache):
+    client = Client()
+    stats.reset()
+    response = client.get('/')
+    key = page_cache_key(
+        response.wsgi_request, index_dependencies(response.wsgi_request)
+    )
+    _, content_type, _ = cache.get(key)
+    cache.set(key, (b'stale page', content_type, 0), 60)
+
+    assert client.get('/').content == b'stale page', (
+        'Убедитесь, что устаревшая страница отдаётся сразу из кеша.'
+    )
+
+    deadline = time.monotonic() + 5
+    while stats.snapshot()['refreshes'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert stats.snapshot()['stale_hits'] == 1
+    assert stats.snapshot()['refreshes'] == 1, (
+        'Убедитесь, что устаревшая страница обновляется в фоне.'
+    )
+    exposition = registry.exposition()
+    assert 'blogicum_page_cache_requests_total{result="stale_hit"}' in (
+        exposition
+    ), 'Убедитесь, что отдача устаревших страниц видна в метриках.'
+    assert 'blogicum_page_cache_refreshes_total{result="done"}' in exposition
+    assert b'<html' in client.get('/').content
+
+
+def test_feed_cache_is_invalidated_by_new_post(
+    page_cache, mixer, user, published_category, client
+):
+    client.get('/')
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    assert post.title in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что новый пост сбрасывает кеш ленты.'
+    )
+    assert post.title in client.get(
+        f'/category/{published_category.slug}/'
+    ).content.decode('utf-8')
+
+    assert 'Комментарии (0)' in client.get('/').content.decode('utf-8')
+    mixer.blend('blog.Comment', post=post, author=user)
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что новый комментарий обновляет счётчик в ленте.'
+    )
+
+    published_category.is_published = False
+    published_category.save()
+    assert post.title not in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что снятие категории с публикации сбрасывает кеш ленты.'
+    )
+
+
+def test_profile_cache_is_keyed_by_author_id(page_cache, mixer, user, client):
+    assert profile_dependencies(None, user.username)[0] == (
+        author_namespace(user.id)
+    ), 'Убедитесь, что страницы автора зависят от его id, а не имени.'
+    client.get(f'/profile/{user.username}/')
+    user.username = 'renamed'
+    user.save()
+    assert client.get('/profile/renamed/').status_code == 200
+    post = mixer.blend('blog.Post', author=user)
+    assert post.title in client.get('/profile/renamed/').content.decode(
+        'utf-8'
+    ), 'Убедитесь, что новый пост сбрасывает кеш переименованного автора.'
+
+
+def test_failed_delete_does_not_leave_marker(mixer, monkeypatch):
+    post = mixer.blend('blog.Post')
+
+    def fail(self):
+        raise RuntimeError
+
+    monkeypatch.setattr('django.db.models.deletion.Collector.delete', fail)
+    with pytest.raises(RuntimeError):
+        post.delete()
+    assert not is_being_deleted(post.pk), (
+        'Убедитесь, что пост не остаётся отмеченным удаляемым после ошибки.'
+    )
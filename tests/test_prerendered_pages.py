@@ -0,0 +1,103 @@
+import pytest
+from django.db import connection
+from django.http import HttpRequest
+from django.test.utils import CaptureQueriesContext
+
+from pages import prerender, views
+
+
+@pytest.fixture
+def prerendered(settings, tmp_path):
+    settings.PRERENDERED_ERROR_PAGES = True
+    settings.PRERENDERED_STATIC_PAGES = True
+    settings.PRERENDERED_PAGES_DIR = tmp_path
+    prerender._pages.clear()
+    yield tmp_path
+    prerender._pages.clear()
+
+
+@pytest.mark.django_db
+def test_prerendered_404_without_db(prerendered, client):
+    client.get('/non-existing-page/')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/another-missing-page/')
+    assert response.status_code == 404
+    content = response.content.decode('utf-8')
+    assert 'http://testserver/another-missing-page/' in content, (
+        'Убедитесь, что на заготовленной странице 404 подставляется '
+        'адрес текущего запроса.'
+    )
+    assert prerender.REQUEST_URL_PLACEHOLDER not in content
+    assert not queries.captured_queries, (
+        'Убедитесь, что заготовленная страница 404 отдаётся '
+        'без запросов к базе данных.'
+    )
+
+
+@pytest.mark.django_db
+def test_prerendered_404_for_authenticated(prerendered, client, user_client,
+                                           user):
+    client.get('/non-existing-page/')
+    response = user_client.get('/another-missing-page/')
+    assert response.status_code == 404
+    content = response.content.decode('utf-8')
+    assert user.username in content and 'Выйти' in content, (
+        'Убедитесь, что на заготовленной странице 404 шапка '
+        'отрисовывается для авторизованного пользователя.'
+    )
+    assert 'Войти' not in content
+    assert 'http://testserver/another-missing-page/' in content
+
+
+def test_prerendered_pages_from_disk(prerendered):
+    target = prerendered / 'anonymous' / 'pages' / '403csrf.html'
+    target.parent.mkdir(parents=True)
+    target.write_bytes('<p>готово</p>'.encode('utf-8'))
+    response = views.csrf_failure(HttpRequest())
+    assert response.status_code == 403
+    assert response.content.decode('utf-8') == '<p>готово</p>', (
+        'Убедитесь, что страницы, сохранённые командой prerender_pages, '
+        'отдаются с диска.'
+    )
+
+
+def test_prerendered_fallback(prerendered, monkeypatch):
+    def broken(template_name):
+        raise RuntimeError
+
+    monkeypatch.setattr(prerender, 'render_page', broken)
+    response = views.server_error(HttpRequest())
+    assert response.status_code == 500
+    assert 'Ошибка сервера' in response.content.decode('utf-8'), (
+        'Убедитесь, что при ошибке отрисовки отдаётся запасная страница.'
+    )
+
+
+@pytest.mark.django_db
+def test_static_pages_bypass_for_anonymous(prerendered, client):
+    client.get('/pages/about/')
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/pages/about/')
+    assert response.status_code == 200
+    assert 'Войти' in response.content.decode('utf-8')
+    assert 'public' in response['Cache-Control'], (
+        'Убедитесь, что заготовленная страница «О проекте» отдаётся '
+        'анонимам с долгоживущими заголовками кеширования.'
+    )
+    assert not queries.captured_queries
+    assert 'sessionid' not in response.cookies
+    repeated = client.get('/pages/about/', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert repeated.status_code == 304
+
+
+@pytest.mark.django_db
+def test_static_pages_for_authenticated(prerendered, user_client, user):
+    response = user_client.get('/pages/rules/')
+    assert response.status_code == 200
+    content = response.content.decode('utf-8')
+    assert user.username in content and 'Выйти' in content, (
+        'Убедитесь, что в заготовленной странице «Правила» шапка '
+        'отрисовывается для авторизованного пользователя.'
+    )
+    assert 'private' in response['Cache-Control']
+    assert 'Cookie' in response['Vary']
@@ -0,0 +1,150 @@
+"""Планы запросов основных страниц по сравнению со снимками.
+
+Снимки лежат в tests/query_plans/. После намеренного изменения запросов
+или индексов их пересобирает `UPDATE_QUERY_PLANS=1 pytest
+tests/test_query_plans.py`.
+"""
+import os
+import re
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+from core.slowqueries import normalize
+
+pytestmark = [pytest.mark.django_db]
+
+SNAPSHOTS = Path(__file__).parent / 'query_plans'
+
+# Только по этим таблицам полный проход или сортировка растут с данными.
+HOT_TABLES = ('blog_post', 'blog_comment')
+
+FULL_SCAN_RE = re.compile(
+    r'\bSCAN (?P<table>\w+)(?: AS \w+)?$'
+)
+SUBQUERY_NUMBER_RE = re.compile(r'(SUBQUERY|CO-ROUTINE) \d+')
+
+
+@pytest.fixture
+def seeded():
+    users = [
+        get_user_model().objects.create(username=f'author{number}')
+        for number in range(5)
+    ]
+    categories = [
+        Category.objects.create(
+            title=f'Категория {number}', description='Описание',
+            slug=f'category-{number}', is_published=number != 3,
+        )
+        for number in range(4)
+    ]
+    locations = [
+        Location.objects.create(name=f'Место {number}') for number in range(3)
+    ]
+    now = timezone.now()
+    # SQLite не возвращает id из bulk_create, поэтому они задаются явно.
+    posts = Post.objects.bulk_create(
+        Post(
+            id=number + 1, title=f'Пост {number}', text='Текст',
+            pub_date=now + timedelta(hours=10 - number),
+            author=users[number % len(users)],
+            category=categories[number % len(categories)],
+            location=locations[number % len(locations)],
+            is_published=number % 17 != 0,
+        )
+        for number in range(400)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            post=posts[number % 40], author=users[number % len(users)],
+            text=f'Комментарий {number}',
+        )
+        for number in range(1000)
+    )
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    return {'post': posts[20], 'category': categories[0], 'user': users[0]}
+
+
+def plan(sql):
+    """Шаги EXPLAIN QUERY PLAN с отступами по вложенности."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        rows = cursor.fetchall()
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        # Фильтр Блума SQLite добавляет по статистике, на план он не влияет.
+        if detail.startswith('BLOOM FILTER'):
+            continue
+        detail = SUBQUERY_NUMBER_RE.sub(r'\1', detail)
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def capture_plans(url):
+    client = Client()
+    # Первый запрос прогревает справочники и индекс существования.
+    assert client.get(url).status_code == 200
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url).status_code == 200
+    return [
+        (query['sql'], plan(query['sql']))
+        for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+    ]
+
+
+def render_snapshot(plans):
+    return ''.join(
+        f'-- {normalize(sql)}\n' + ''.join(f'{line}\n' for line in lines)
+        + '\n'
+        for sql, lines in plans
+    )
+
+
+def regressions(plans):
+    problems = []
+    for sql, lines in plans:
+        if not any(f'"{table}"' in sql for table in HOT_TABLES):
+            continue
+        for line in lines:
+            match = FULL_SCAN_RE.search(line.strip())
+            if match and match['table'] in HOT_TABLES:
+                problems.append(f'полный проход: {line.strip()}')
+            if 'USE TEMP B-TREE' in line:
+                problems.append(f'временная сортировка: {line.strip()}')
+    return problems
+
+
+@pytest.mark.parametrize('name', [
+    'index', 'category_posts', 'profile_view', 'post_detail',
+])
+def test_query_plans(seeded, name):
+    url = {
+        'index': '/',
+        'category_posts': f'/category/{seeded["category"].slug}/',
+        'profile_view': f'/profile/{seeded["user"].username}/',
+        'post_detail': f'/posts/{seeded["post"].id}/',
+    }[name]
+    plans = capture_plans(url)
+    problems = regressions(plans)
+    assert not problems, (
+        f'Убедитесь, что запросы страницы {name} используют индексы: '
+        + '; '.join(problems)
+    )
+    snapshot = render_snapshot(plans)
+    path = SNAPSHOTS / f'{name}.txt'
+    if os.environ.get('UPDATE_QUERY_PLANS') or not path.exists():
+        path.write_text(snapshot, encoding='utf-8')
+    assert snapshot == path.read_text(encoding='utf-8'), (
+        f'План запросов страницы {name} изменился, сравните с {path.name}.'
+    )
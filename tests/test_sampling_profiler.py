@@ -0,0 +1,55 @@
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from django.core.management import call_command
+from django.test import RequestFactory
+
+from core.sampling import (
+    SamplingProfilerMiddleware, collapse, hottest, read_stacks, write_stacks,
+)
+
+
+def slow_view(request):
+    request.resolver_match = SimpleNamespace(view_name='blog:index')
+    time.sleep(0.05)
+    return 'ok'
+
+
+def test_collapse_stops_at_root():
+    def inner(root):
+        return collapse(sys._getframe(), root)
+
+    stack = inner(sys._getframe())
+    frames = stack.split(';')
+    assert len(frames) == 2
+    assert frames[0].startswith('test_collapse_stops_at_root (')
+    assert frames[1].startswith('inner (')
+
+
+def test_middleware_writes_stacks_by_view(settings, tmp_path):
+    settings.PROFILING_SAMPLE_RATE = 1
+    settings.PROFILING_INTERVAL = 0.001
+    settings.PROFILING_DIR = tmp_path
+    middleware = SamplingProfilerMiddleware(slow_view)
+    assert middleware(RequestFactory().get('/')) == 'ok'
+    views = read_stacks(tmp_path)
+    assert list(views) == ['blog.index'], (
+        'Убедитесь, что стеки группируются по имени представления.'
+    )
+    stack, _ = views['blog.index'].most_common(1)[0]
+    assert stack.split(';')[-1].startswith('slow_view ('), (
+        'Убедитесь, что в стек попадает код представления.'
+    )
+
+
+def test_report_merges_processes(tmp_path, capsys):
+    write_stacks('blog:index', Counter({'a;b': 3, 'a;c': 1}), tmp_path)
+    (tmp_path / 'blog.index.1.folded').write_text('a;b 2\n')
+    assert hottest(read_stacks(tmp_path)['blog.index'], 1) == [('b', 5, 5)]
+    call_command('profile_report', dir=tmp_path, merge=tmp_path / 'merged')
+    assert (tmp_path / 'merged' / 'blog.index.folded').read_text() == (
+        'a;b 5\na;c 1\n'
+    )
+    assert 'blog.index: 6 выборок' in capsys.readouterr().out
@@ -0,0 +1,55 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_seed_load(django_user_model):
+    out = StringIO()
+    call_command(
+        'seed_load', users=5, categories=2, locations=3, posts=40,
+        comments=60, batch_size=7, seed=1, future_share=0.2,
+        unpublished_share=0.2, stdout=out,
+    )
+    assert django_user_model.objects.count() == 5
+    assert Category.objects.count() == 2
+    assert Location.objects.count() == 3
+    assert Post.objects.count() == 40
+    assert Comment.objects.count() == 60
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        'Убедитесь, что seed_load создаёт отложенные публикации.'
+    )
+    assert Post.objects.filter(is_published=False).exists()
+    assert 'Публикации: 40/40' in out.getvalue(), (
+        'Убедитесь, что seed_load сообщает о ходе загрузки.'
+    )
+    post = Post.objects.create(
+        author=django_user_model.objects.first(),
+        title='Новый пост', text='Текст', pub_date=timezone.now(),
+    )
+    assert post.id == 41, (
+        'Убедитесь, что после загрузки последовательности id сдвинуты.'
+    )
+
+
+def test_seed_load_requires_users():
+    with pytest.raises(CommandError):
+        call_command('seed_load', users=0, posts=1, stdout=StringIO())
+
+
+def test_seed_load_resets_caches(monkeypatch):
+    from blog.management.commands import seed_load
+
+    calls = []
+    monkeypatch.setattr(
+        seed_load, 'invalidate_after_load', lambda: calls.append(True)
+    )
+    call_command('seed_load', users=1, posts=1, comments=0, stdout=StringIO())
+    assert calls, (
+        'Убедитесь, что seed_load сбрасывает кеши так же, как loaddata.'
+    )
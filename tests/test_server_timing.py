@@ -0,0 +1,48 @@
+import pytest
+from django.core.cache import caches
+from django.test import Client
+
+from core.timing import server_timing
+
+pytestmark = [pytest.mark.django_db]
+
+
+def metrics(response):
+    header = response['Server-Timing']
+    return {part.split(';')[0]: part for part in header.split(', ')}
+
+
+def test_server_timing_format():
+    assert server_timing([
+        ('total', 0.0125, None), ('tpl-0', 0.001, 'blog/"x".html'),
+    ]) == 'total;dur=12.50, tpl-0;dur=1.00;desc="blog/\\"x\\".html"'
+
+
+def test_server_timing_disabled_by_default(
+    many_posts_with_published_locations
+):
+    response = Client().get('/')
+    assert 'Server-Timing' not in response, (
+        'Убедитесь, что заголовок Server-Timing включается настройкой.'
+    )
+
+
+def test_server_timing_breakdown(
+    settings, many_posts_with_published_locations, caplog
+):
+    settings.SERVER_TIMING = True
+    caches['hot'].clear()
+    response = Client().get('/')
+    assert response.status_code == 200
+    parts = metrics(response)
+    assert {'total', 'mw', 'sql', 'cache-get', 'tpl-0'} <= set(parts), (
+        'Убедитесь, что Server-Timing разбивает время на SQL, кеш, '
+        'шаблоны и middleware.'
+    )
+    assert 'desc="blog/index.html"' in parts['tpl-0']
+    assert 'tpl-1' not in parts, (
+        'Убедитесь, что карточки внутри ленты не считаются отдельными '
+        'шаблонами верхнего уровня.'
+    )
+    log = [r for r in caplog.records if r.name == 'core.timing']
+    assert len(log) == 1 and '"view": "blog:index"' in log[0].getMessage()
@@ -0,0 +1,46 @@
+from importlib import import_module
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def session_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    return [
+        query for query in queries.captured_queries
+        if 'django_session' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+def test_no_session_queries_without_cookie(client):
+    assert not session_queries(client, '/'), (
+        'Убедитесь, что анонимный запрос без сессионной cookie '
+        'не обращается к таблице сессий.'
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('storage', ['cached_db', 'signed_cookies'])
+def test_anonymous_session_without_db(settings, client, storage):
+    settings.SESSION_ENGINE = settings.SESSION_ENGINES[storage]
+    store = import_module(settings.SESSION_ENGINE).SessionStore()
+    store['visited'] = True
+    store.save()
+    client.cookies[settings.SESSION_COOKIE_NAME] = store.session_key
+    client.get('/')
+    assert not session_queries(client, '/'), (
+        f'Убедитесь, что с хранилищем сессий {storage} повторный анонимный '
+        'запрос не читает таблицу сессий.'
+    )
+
+
+@pytest.mark.django_db
+def test_logged_in_session_read_from_cache(client, user):
+    client.force_login(user)
+    assert not session_queries(client, '/'), (
+        'Убедитесь, что после входа сессия читается из кеша, '
+        'без запросов к таблице сессий.'
+    )
@@ -0,0 +1,79 @@
+import multiprocessing
+import os
+import threading
+import time
+
+from django.core.cache import cache
+
+from core.singleflight import SingleFlight
+
+
+def test_concurrent_misses_are_computed_once():
+    cache.clear()
+    flight = SingleFlight(lock_timeout=5)
+    calls = []
+    results = []
+    barrier = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'page'
+
+    def worker():
+        barrier.wait()
+        results.append(flight.do('key', compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1, (
+        'Убедитесь, что одновременные промахи кеша вычисляются один раз.'
+    )
+    assert results == ['page'] * 8
+
+
+def test_waiter_uses_value_from_another_process():
+    cache.clear()
+    flight = SingleFlight(lock_timeout=1, poll_interval=0.01)
+    cache.add('lock:key', 'another-process', 1)
+    cache.set('key', 'ready')
+    result = flight.do(
+        'key', lambda: 'computed', recheck=lambda: cache.get('key')
+    )
+    assert result == 'ready', (
+        'Убедитесь, что при чужой блокировке значение берётся из кеша.'
+    )
+
+
+def test_stale_value_is_served_while_lock_is_held():
+    cache.clear()
+    flight = SingleFlight(lock_timeout=1)
+    cache.add('lock:key', 'another-process', 1)
+    assert flight.do('key', lambda: 'computed', stale='stale') == 'stale'
+
+
+def _claim(barrier, results):
+    barrier.wait()
+    results.put(cache.add('lock:claim', os.getpid(), 5))
+
+
+def test_lock_is_taken_by_one_process():
+    cache.clear()
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(8)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_claim, args=(barrier, results))
+        for _ in range(8)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    claims = [results.get() for _ in processes]
+    assert claims.count(True) == 1, (
+        'Убедитесь, что блокировку в кеше получает только один процесс.'
+    )
@@ -0,0 +1,57 @@
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+from core.slowqueries import fingerprint, normalize, read_records
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_normalize_hides_values():
+    assert normalize(
+        'SELECT "blog_post"."id" FROM "blog_post"\n'
+        "WHERE \"blog_post\".\"title\" = 'it''s' AND id IN (%s, %s, %s) "
+        'LIMIT 10'
+    ) == (
+        'SELECT "blog_post"."id" FROM "blog_post" '
+        'WHERE "blog_post"."title" = ? AND id IN (...) LIMIT ?'
+    )
+    assert fingerprint('SELECT 1 FROM t WHERE id IN (%s)') == fingerprint(
+        'SELECT 2 FROM t WHERE id IN (%s, %s)'
+    ), 'Убедитесь, что отпечаток не зависит от значений и длины IN.'
+
+
+def test_slow_queries_are_logged_with_plan(
+    settings, tmp_path, many_posts_with_published_locations
+):
+    settings.SLOW_QUERY_THRESHOLD = 0
+    settings.SLOW_QUERY_LOG = tmp_path / 'slow.jsonl'
+    assert Client().get('/').status_code == 200
+    records = list(read_records(settings.SLOW_QUERY_LOG))
+    assert records, 'Убедитесь, что запросы дольше порога попадают в журнал.'
+    feed = [r for r in records if 'FROM "blog_post"' in r['sql']]
+    assert feed and all(r['view'] == 'blog:index' for r in feed), (
+        'Убедитесь, что в журнал пишется имя представления.'
+    )
+    assert any(
+        'SCAN' in line or 'SEARCH' in line
+        for line in feed[0]['plan']
+    ), 'Убедитесь, что к запросу прикладывается EXPLAIN QUERY PLAN.'
+
+
+def test_slow_queries_report(
+    settings, tmp_path, capsys, many_posts_with_published_locations
+):
+    settings.SLOW_QUERY_THRESHOLD = 0
+    settings.SLOW_QUERY_LOG = tmp_path / 'slow.jsonl'
+    client = Client()
+    client.get('/')
+    client.get('/')
+    call_command('slow_queries', log=settings.SLOW_QUERY_LOG, top=1)
+    output = capsys.readouterr().out
+    assert '1. ' in output and '2. ' not in output, (
+        'Убедитесь, что отчёт показывает только top-N отпечатков.'
+    )
+    assert 'Представления: blog:index ×2' in output, (
+        'Убедитесь, что одинаковые запросы группируются по отпечатку.'
+    )
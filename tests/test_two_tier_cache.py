@@ -0,0 +1,132 @@
+import multiprocessing
+import pickle
+
+import pytest
+from django.core.cache import caches
+
+from core.generations import bump_generations, get_generations
+
+
+@pytest.fixture
+def hot_cache():
+    cache = caches['hot']
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_local_tier_serves_repeated_reads(hot_cache):
+    hot_cache.set('category:slug', {'title': 'Путешествия'})
+    hot_cache.shared.clear()
+    assert hot_cache.get('category:slug') == {'title': 'Путешествия'}, (
+        'Убедитесь, что повторное чтение обслуживается локальным уровнем.'
+    )
+
+
+def test_generation_bump_invalidates_other_processes(hot_cache):
+    hot_cache.set('category:slug', 'old')
+    other_process_generation = hot_cache.generation('hot:1:category')
+    # Имитируем запись из другого процесса: общий уровень и поколение
+    # меняются, локальная копия этого процесса остаётся прежней.
+    shared = hot_cache.shared
+    shared.set(hot_cache.make_key('category:slug'), 'new')
+    shared.set(
+        '__generation__:hot:1:category', other_process_generation + 1
+    )
+    local = hot_cache._local
+    local.generations['hot:1:category'] = (other_process_generation, 0)
+    assert hot_cache.get('category:slug') == 'new', (
+        'Убедитесь, что локальные копии сбрасываются при смене поколения.'
+    )
+
+
+def test_local_tier_is_bounded(hot_cache, monkeypatch):
+    local = hot_cache._local
+    monkeypatch.setattr(local, 'max_entries', 5)
+    for index in range(10):
+        hot_cache.set(f'card:{index}', index)
+    assert len(local.entries) <= 5
+    assert hot_cache.get('card:0') == 0, (
+        'Убедитесь, что вытесненные из LRU значения читаются из общего кеша.'
+    )
+
+
+def test_set_keeps_neighbours_in_local_tier(hot_cache):
+    hot_cache.set('card:1', 'first')
+    hot_cache.set('card:2', 'second')
+    hot_cache.shared.delete(hot_cache.make_key('card:1'))
+    assert hot_cache.get('card:1') == 'first', (
+        'Убедитесь, что запись одного ключа не сбрасывает локальные копии '
+        'остальных ключей пространства имён.'
+    )
+    hot_cache.delete('card:1')
+    assert hot_cache.get('card:1') is None
+
+
+def test_clear_keeps_default_cache(hot_cache):
+    caches['default'].set('page', 'cached')
+    hot_cache.set('card:1', 'value')
+    hot_cache.clear()
+    assert hot_cache.get('card:1') is None
+    assert caches['default'].get('page') == 'cached', (
+        'Убедитесь, что очистка кеша горячих объектов не трогает '
+        'кеш страниц и сессий.'
+    )
+    caches['default'].delete('page')
+
+
+def _bump(barrier, count):
+    barrier.wait()
+    for _ in range(count):
+        caches['hot'].bump_generation('hot:1:card')
+
+
+def test_generation_bumps_are_not_lost(hot_cache):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(4)
+    processes = [
+        context.Process(target=_bump, args=(barrier, 25))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert hot_cache.shared.get('__generation__:hot:1:card') == 100, (
+        'Убедитесь, что одновременные увеличения поколения из разных '
+        'процессов не теряются.'
+    )
+
+
+def _bump_generations(barrier, count):
+    barrier.wait()
+    for _ in range(count):
+        bump_generations(['feed'])
+
+
+def test_bump_generations_is_atomic(hot_cache):
+    before = get_generations(['feed'])['feed']
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(4)
+    processes = [
+        context.Process(target=_bump_generations, args=(barrier, 25))
+        for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    hot_cache._local.clear()
+    assert get_generations(['feed'])['feed'] == before + 100, (
+        'Убедитесь, что поколения увеличиваются атомарно между процессами.'
+    )
+
+
+def test_incr_keeps_expiry(hot_cache):
+    shared = hot_cache.shared
+    shared.set('counter', 1, None)
+    assert shared.incr('counter') == 2
+    with open(shared._key_to_file('counter'), 'rb') as f:
+        assert pickle.load(f) is None, (
+            'Убедитесь, что incr не меняет срок хранения счётчика.'
+        )
@@ -0,0 +1,60 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def user_queries(client, url='/pages/about/'):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [
+        query for query in queries.captured_queries
+        if 'FROM "auth_user"' in query['sql']
+    ]
+
+
+def test_user_is_cached(user_client, user):
+    user_queries(user_client)
+    response, queries = user_queries(user_client)
+    assert response.wsgi_request.user == user
+    assert not queries, (
+        'Убедитесь, что пользователь сессии не читается из базы данных '
+        'на каждом запросе.'
+    )
+
+
+def test_profile_edit_invalidates_cache(user_client, user):
+    password = user.password
+    user_queries(user_client)
+    response = user_client.post('/profile/edit/', {
+        'first_name': 'Новое имя',
+        'last_name': user.last_name,
+        'username': user.username,
+        'email': 'new@example.com',
+    })
+    assert response.status_code == 302
+    response, _ = user_queries(user_client)
+    assert response.wsgi_request.user.first_name == 'Новое имя', (
+        'Убедитесь, что после редактирования профиля закешированный '
+        'пользователь обновляется.'
+    )
+    user.refresh_from_db()
+    assert user.password == password, (
+        'Убедитесь, что сохранение закешированного пользователя '
+        'не затирает поля, которых нет в кеше.'
+    )
+
+
+def test_password_change_logs_out_other_sessions(user):
+    client = Client()
+    client.force_login(user)
+    user_queries(client)
+    user.set_password('Nov0e-parol-42')
+    user.save()
+    response, _ = user_queries(client)
+    assert not response.wsgi_request.user.is_authenticated, (
+        'Убедитесь, что смена пароля сбрасывает закешированного '
+        'пользователя в открытых сессиях.'
+    )